@@ -1,16 +1,25 @@
 """
 Build script to create a static site bundle for GitHub Pages.
-Combines all transcripts into a single JSON file with video metadata.
+Combines all transcripts into a single JSON file with video metadata, plus
+the autocomplete vocabulary (vocabulary.json).
+
+Usage: python build_static.py [--slim]
 """
 import json
+import os
+import sys
+from collections import Counter
 from pathlib import Path
-import yt_dlp
-from datetime import datetime
 from tqdm import tqdm
+from searcher import TranscriptSearcher
+from vocabulary import Vocabulary, count_terms
+from sources import create_source, format_metadata
+
+_source = None
 
 def fetch_video_metadata(video_id):
     """
-    Fetch video metadata from YouTube.
+    Fetch video metadata from the video source (YouTube by default).
     
     Args:
         video_id: YouTube video ID
@@ -18,32 +27,13 @@ def fetch_video_metadata(video_id):
     Returns:
         Dictionary with title, upload_date, and author
     """
+    global _source
     try:
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-        }
+        # One source for the whole build so its session is reused
+        if _source is None:
+            _source = create_source()
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(f'https://www.youtube.com/watch?v={video_id}', download=False)
-            
-            # Parse upload date (format: YYYYMMDD)
-            upload_date_str = info.get('upload_date', '')
-            if upload_date_str:
-                upload_date = datetime.strptime(upload_date_str, '%Y%m%d')
-                formatted_date = upload_date.strftime('%B %d, %Y')
-            else:
-                formatted_date = 'Unknown'
-            
-            return {
-                'title': info.get('title', 'Unknown Title'),
-                'upload_date': formatted_date,
-                'upload_date_raw': upload_date_str,
-                'author': info.get('uploader', 'Unknown'),
-                'channel_id': info.get('channel_id', ''),
-                'duration': info.get('duration', 0)
-            }
+        return format_metadata(_source.fetch_metadata(video_id))
     except Exception as e:
         print(f"[WARNING] Failed to fetch metadata for {video_id}: {e}")
         return {
@@ -55,51 +45,96 @@ def fetch_video_metadata(video_id):
             'duration': 0
         }
 
-def build_static_site():
-    """Bundle all transcripts into a single JSON file for static hosting."""
-    transcripts_dir = Path("transcripts")
+def build_static_site(slim=False):
+    """
+    Bundle all transcripts into a single JSON file for static hosting.
+    
+    A loading pass validates the transcripts and counts their terms, then each
+    transcript is read again and streamed straight into the bundle as compact
+    JSON. Only one transcript is held at a time, so memory use does not grow
+    with the number of transcripts.
+    
+    Args:
+        slim: Drop the full_text and video_path fields, which the static
+            site does not use
+    """
     output_dir = Path(".")  # Output to root directory
     
     # Create output directory (already exists as root)
     output_dir.mkdir(exist_ok=True)
     
-    # Load all transcripts
-    all_transcripts = []
-    transcript_files = list(transcripts_dir.glob("*.json"))
+    # List transcripts (flat transcripts/ directory plus every channel corpus)
+    transcript_files = TranscriptSearcher().get_transcript_files()
     
     print(f"[INFO] Found {len(transcript_files)} transcript files")
     print()
     
-    # Load transcripts with progress bar
+    # Validate transcripts and count their terms; only the paths are kept
     print("[STEP 1/2] Loading transcripts...")
-    for transcript_path in tqdm(transcript_files, desc="Loading", unit="file"):
+    loaded_files = []
+    term_counts = Counter()
+    for channel, transcript_path in tqdm(transcript_files, desc="Loading", unit="file"):
         try:
             with open(transcript_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                all_transcripts.append(data)
+                transcript = json.load(f)
         except Exception as e:
             print(f"\n[ERROR] Failed to load {transcript_path.name}: {e}")
+            continue
+        term_counts.update(count_terms(transcript))
+        loaded_files.append((channel, transcript_path))
     
-    print(f"[OK] Loaded {len(all_transcripts)} transcripts")
+    print(f"[OK] Loaded {len(loaded_files)} transcripts")
     print()
     
-    # Fetch metadata for each video
+    # Stream each transcript with its metadata into the bundle
     print("[STEP 2/2] Fetching video metadata from YouTube...")
-    for transcript in tqdm(all_transcripts, desc="Fetching metadata", unit="video"):
-        video_id = transcript.get('video_id', 'unknown')
-        metadata = fetch_video_metadata(video_id)
-        transcript['metadata'] = metadata
+    output_file = output_dir / "transcripts.json"
+    tmp_file = output_dir / ".transcripts.json.tmp"
+    count = 0
+    
+    with open(tmp_file, 'w', encoding='utf-8') as out:
+        out.write('[')
+        
+        for channel, transcript_path in tqdm(loaded_files, desc="Fetching metadata", unit="video"):
+            try:
+                with open(transcript_path, 'r', encoding='utf-8') as f:
+                    transcript = json.load(f)
+            except Exception as e:
+                print(f"\n[ERROR] Failed to load {transcript_path.name}: {e}")
+                continue
+            
+            if slim:
+                transcript.pop('full_text', None)
+                transcript.pop('video_path', None)
+            if channel:
+                transcript['channel'] = channel
+            
+            video_id = transcript.get('video_id', 'unknown')
+            transcript['metadata'] = fetch_video_metadata(video_id)
+            
+            if count:
+                out.write(',')
+            json.dump(transcript, out, ensure_ascii=False, separators=(',', ':'))
+            count += 1
+        
+        out.write(']')
+    
+    # Replace the previous bundle only once the new one is complete
+    os.replace(tmp_file, output_file)
     
-    print(f"[OK] Fetched metadata for {len(all_transcripts)} videos")
+    print(f"[OK] Fetched metadata for {count} videos")
     print()
     
-    # Write bundled transcripts with metadata
-    output_file = output_dir / "transcripts.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_transcripts, f, ensure_ascii=False, indent=2)
+    # Sorted terms with counts, searched by prefix in the browser
+    vocabulary = Vocabulary.from_counts(term_counts)
+    vocabulary_file = output_dir / "vocabulary.json"
+    with open(vocabulary_file, 'w', encoding='utf-8') as f:
+        json.dump(vocabulary.to_json(), f, ensure_ascii=False, separators=(',', ':'))
+    print(f"[OK] Wrote {vocabulary_file} ({len(vocabulary)} terms)")
+    print()
     
     print(f"[SUCCESS] Created {output_file}")
-    print(f"[INFO] Total transcripts: {len(all_transcripts)}")
+    print(f"[INFO] Total transcripts: {count}")
     
     # Calculate total size
     size_mb = output_file.stat().st_size / (1024 * 1024)
@@ -108,7 +143,7 @@ def build_static_site():
     if size_mb > 10:
         print("[WARNING] Bundle is quite large. Consider splitting or compressing.")
     
-    return len(all_transcripts)
+    return count
 
 if __name__ == "__main__":
     print("=" * 50)
@@ -116,7 +151,8 @@ if __name__ == "__main__":
     print("=" * 50)
     print()
     
-    count = build_static_site()
+    # --slim drops fields the static site does not need (full_text, video_path)
+    count = build_static_site(slim="--slim" in sys.argv[1:])
     
     print()
     print("=" * 50)
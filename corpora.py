@@ -0,0 +1,90 @@
+"""
+Layout helpers for per-channel corpora.
+
+Each channel gets its own namespace under the corpora directory:
+
+    corpora/<channel>/videos/
+    corpora/<channel>/transcripts/
+
+The flat videos/ and transcripts/ directories used by single-channel runs
+are still supported alongside this layout.
+"""
+import re
+from pathlib import Path
+from typing import List, Tuple
+
+DEFAULT_CORPORA_DIR = "corpora"
+
+
+def safe_channel_name(name: str) -> str:
+    """
+    Make a channel name usable as a single directory name under the corpora root.
+
+    Args:
+        name: Channel name, e.g. from a config file
+
+    Returns:
+        Name with path separators and other unsafe characters replaced by "-"
+        (and no leading dots, so it is never hidden or a parent reference)
+    """
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '-', name).strip('-.')
+    return slug or 'channel'
+
+
+def channel_slug(channel_url: str) -> str:
+    """
+    Derive a filesystem-safe channel name from a channel URL.
+
+    Args:
+        channel_url: URL of the YouTube channel/profile (or a plain name)
+
+    Returns:
+        Channel name, e.g. "channelname" for https://www.youtube.com/@channelname/videos
+    """
+    path = re.sub(r'^[a-z]+://[^/]+', '', channel_url.strip())
+    parts = [p for p in path.split('/') if p]
+
+    # Prefer the handle or channel ID over tab names such as /videos or /streams
+    name = parts[0] if parts else channel_url
+    for i, part in enumerate(parts):
+        if part.startswith('@'):
+            name = part
+            break
+        if part in ('channel', 'c', 'user') and i + 1 < len(parts):
+            name = parts[i + 1]
+            break
+
+    return safe_channel_name(name.lstrip('@'))
+
+
+def channel_dirs(channel: str, corpora_dir: str = DEFAULT_CORPORA_DIR) -> Tuple[Path, Path]:
+    """
+    Get the videos and transcripts directories for a channel.
+
+    Args:
+        channel: Channel name (see channel_slug)
+        corpora_dir: Root directory holding all channel corpora
+
+    Returns:
+        Tuple of (videos_dir, transcripts_dir)
+    """
+    root = Path(corpora_dir) / channel
+    return root / "videos", root / "transcripts"
+
+
+def list_channels(corpora_dir: str = DEFAULT_CORPORA_DIR) -> List[str]:
+    """
+    List the channels that have a transcripts directory in the corpora root.
+
+    Args:
+        corpora_dir: Root directory holding all channel corpora
+
+    Returns:
+        Sorted list of channel names
+    """
+    root = Path(corpora_dir)
+    if not root.exists():
+        return []
+
+    return sorted(p.name for p in root.iterdir() if (p / "transcripts").is_dir())
+
@@ -1,25 +1,84 @@
 """
 Video downloader module for downloading all videos from a YouTube channel/profile.
 """
+import random
 import subprocess
 import sys
-import json
+import time
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, Dict, List, Union
 from tqdm import tqdm
+from sources import VideoSource, create_source, is_transient_error, video_url
 
 
 class ChannelDownloader:
-    def __init__(self, output_dir: str = "videos"):
+    def __init__(self, output_dir: str = "videos", source: Union[str, VideoSource] = None, retries: int = 3,
+                 backoff: float = 2.0, concurrent_fragments: int = 4, show_progress: bool = True):
         """
         Initialize the channel downloader.
         
         Args:
             output_dir: Directory where videos will be saved
+            source: Video source instance or name - "inprocess", "subprocess",
+                "fake" or "auto" (defaults to the VIDEO_INDEX_SOURCE environment variable)
+            retries: Number of retries for failed listings/downloads
+            backoff: Base delay in seconds, doubled after every failed attempt
+            concurrent_fragments: Parallel fragment downloads per video
+            show_progress: Show a progress bar while downloading
         """
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.retries = retries
+        self.backoff = backoff
+        self._progress_bars = {}
+        if isinstance(source, VideoSource):
+            self.source = source
+        else:
+            self.source = create_source(source, concurrent_fragments,
+                                        self._progress_hook if show_progress else None)
+    
+    def _progress_hook(self, progress: Dict):
+        """Render yt-dlp progress callbacks as one progress bar per file."""
+        filename = progress.get('filename')
+        bar = self._progress_bars.get(filename)
+        
+        if progress.get('status') == 'downloading':
+            total = progress.get('total_bytes') or progress.get('total_bytes_estimate')
+            if bar is None:
+                bar = tqdm(total=total, desc=Path(filename or '').stem, unit='B',
+                           unit_scale=True, leave=False)
+                self._progress_bars[filename] = bar
+            if total:
+                bar.total = total
+            bar.update(progress.get('downloaded_bytes', 0) - bar.n)
+        elif bar is not None:
+            bar.close()
+            del self._progress_bars[filename]
+    
+    def _with_retries(self, action: Callable, description: str):
+        """
+        Run an action, retrying transient failures with exponential backoff and jitter.
+        
+        Other failures (e.g. private, unavailable or members-only videos) are
+        raised immediately.
         
+        Args:
+            action: Callable to run
+            description: What is being attempted (for log messages)
+            
+        Returns:
+            The action's return value
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                return action()
+            except Exception as e:
+                if attempt == self.retries or not is_transient_error(e):
+                    raise
+                delay = self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+                print(f"[RETRY] {description} failed ({str(e).strip()[:200]}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+    
     def get_channel_videos(self, channel_url: str) -> List[Dict]:
         """
         Get list of all videos from a YouTube channel.
@@ -33,30 +92,19 @@ class ChannelDownloader:
         print(f"[INFO] Fetching video list from channel: {channel_url}")
         
         try:
-            # Use yt-dlp to get video metadata without downloading
-            cmd = [
-                sys.executable, "-m", "yt_dlp",
-                "--flat-playlist",
-                "--dump-json",
-                channel_url
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            entries = self._with_retries(lambda: list(self.source.list_videos(channel_url)),
+                                         "Fetching channel videos")
             
-            # Parse JSON output (one JSON object per line)
             videos = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    try:
-                        video_data = json.loads(line)
-                        videos.append({
-                            'id': video_data.get('id'),
-                            'title': video_data.get('title'),
-                            'url': f"https://www.youtube.com/watch?v={video_data.get('id')}",
-                            'duration': video_data.get('duration')
-                        })
-                    except json.JSONDecodeError:
-                        continue
+            for video_data in entries:
+                if not video_data.get('id'):
+                    continue
+                videos.append({
+                    'id': video_data.get('id'),
+                    'title': video_data.get('title'),
+                    'url': video_url(video_data.get('id')),
+                    'duration': video_data.get('duration')
+                })
             
             print(f"[INFO] Found {len(videos)} videos in channel")
             return videos
@@ -65,7 +113,7 @@ class ChannelDownloader:
             print(f"[ERROR] Failed to fetch channel videos: {e.stderr}")
             return []
         except Exception as e:
-            print(f"[ERROR] Unexpected error: {str(e)}")
+            print(f"[ERROR] Failed to fetch channel videos: {str(e)}")
             return []
     
     def download_video(self, video_url: str, video_id: str) -> bool:
@@ -93,23 +141,17 @@ class ChannelDownloader:
                 return True
         
         try:
-            cmd = [
-                sys.executable, "-m", "yt_dlp",
-                "-f", "best[ext=mp4]/best",
-                "-o", str(output_path),
-                video_url
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            self._with_retries(lambda: self.source.download(video_url, output_path),
+                               f"Downloading {video_id}")
             
-            if result.returncode == 0 and output_path.exists():
+            if output_path.exists():
                 return True
             else:
-                print(f"[ERROR] Failed to download {video_id}: {result.stderr}")
+                print(f"[ERROR] Failed to download {video_id}: output file missing")
                 return False
                 
         except Exception as e:
-            print(f"[ERROR] Exception downloading {video_id}: {str(e)}")
+            print(f"[ERROR] Failed to download {video_id}: {str(e)}")
             return False
     
     def download_all(self, channel_url: str, max_videos: int = None) -> List[str]:
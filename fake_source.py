@@ -0,0 +1,204 @@
+"""
+Local YouTube stand-in for offline end-to-end testing and benchmarking.
+
+FakeSource serves a synthetic channel listing, generated audio files and
+video metadata, with configurable latency and failure injection. Select it
+for every entry point (process_videos.py, build_static.py, web_server.py)
+with VIDEO_INDEX_SOURCE=fake; the VIDEO_INDEX_FAKE_* variables below tune it.
+
+Run this module directly to benchmark the full pipeline against it:
+
+    python fake_source.py [num_videos] [latency] [failure_rate] [model]
+"""
+import math
+import os
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import wave
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+from sources import SOURCE_ENV, TransientSourceError, VideoSource
+
+FAKE_ENV = {
+    'num_videos': ("VIDEO_INDEX_FAKE_VIDEOS", int),
+    'duration': ("VIDEO_INDEX_FAKE_DURATION", float),
+    'latency': ("VIDEO_INDEX_FAKE_LATENCY", float),
+    'failure_rate': ("VIDEO_INDEX_FAKE_FAILURE_RATE", float),
+    'seed': ("VIDEO_INDEX_FAKE_SEED", int),
+}
+
+
+class FakeSourceError(TransientSourceError):
+    """Injected failure from the fake source."""
+
+
+class FakeSource(VideoSource):
+    """Synthetic channel source; deterministic for a given seed."""
+
+    name = "fake"
+
+    def __init__(self, num_videos: int = 20, duration: float = 30.0, latency: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0, sample_rate: int = 16000,
+                 progress_hook: Callable[[Dict], None] = None):
+        """
+        Initialize the fake source.
+
+        Args:
+            num_videos: Number of videos in every channel
+            duration: Length of each generated audio file in seconds
+            latency: Seconds each request takes (listing, download, metadata),
+                with +/-25% jitter
+            failure_rate: Probability (0-1) that a request fails; failures are
+                transient, so retries can succeed
+            seed: Seed for latency jitter and failure injection
+            sample_rate: Sample rate of the generated audio
+            progress_hook: Called with yt-dlp style progress dictionaries while downloading
+        """
+        self.num_videos = num_videos
+        self.duration = duration
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.sample_rate = sample_rate
+        self.progress_hook = progress_hook
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = {'list': 0, 'download': 0, 'metadata': 0, 'failed': 0}
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "FakeSource":
+        """Create a fake source configured from VIDEO_INDEX_FAKE_* environment variables."""
+        for param, (env_name, cast) in FAKE_ENV.items():
+            if os.environ.get(env_name):
+                kwargs.setdefault(param, cast(os.environ[env_name]))
+        return cls(**kwargs)
+
+    def _request(self, kind: str, what: str):
+        """Simulate one request: wait for the configured latency, maybe fail."""
+        with self._lock:
+            self.requests[kind] += 1
+            jitter = self._random.uniform(0.75, 1.25)
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.requests['failed'] += 1
+
+        if self.latency:
+            time.sleep(self.latency * jitter)
+        if failed:
+            raise FakeSourceError(f"Injected failure while fetching {what}")
+
+    @staticmethod
+    def _channel_prefix(channel_url: str) -> str:
+        """Stable 3-character ID prefix so every fake channel has distinct video IDs."""
+        return f"{zlib.crc32(channel_url.encode('utf-8')) % 4096:03x}"
+
+    def _video_number(self, video_id: str) -> int:
+        return int(video_id[3:]) if video_id[3:].isdigit() else 0
+
+    def list_videos(self, channel_url: str) -> Iterator[Dict]:
+        self._request('list', channel_url)
+        prefix = self._channel_prefix(channel_url)
+
+        # Most recent first, like a real channel listing
+        return iter([{
+            'id': f"{prefix}{i:08d}",
+            'title': f"Fake video {i} ({channel_url})",
+            'duration': self.duration
+        } for i in range(self.num_videos, 0, -1)])
+
+    def download(self, video_url: str, output_path: Path):
+        match = re.search(r'[?&]v=([^&]+)', video_url)
+        video_id = match.group(1) if match else Path(output_path).stem
+        self._request('download', video_id)
+
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + ".part")
+        self._write_audio(tmp_path, self._video_number(video_id))
+        os.replace(tmp_path, output_path)
+
+        if self.progress_hook:
+            size = output_path.stat().st_size
+            for status in ('downloading', 'finished'):
+                self.progress_hook({
+                    'status': status,
+                    'filename': str(output_path),
+                    'downloaded_bytes': size,
+                    'total_bytes': size
+                })
+
+    def _write_audio(self, path: Path, number: int):
+        """
+        Write a WAV file of one-second tones (ffmpeg decodes it regardless of extension).
+
+        Args:
+            path: Destination file
+            number: Video number, used to vary the tones between videos
+        """
+        rate = self.sample_rate
+        tones = []
+        for step in range(4):
+            freq = 220.0 * 2 ** (((number + step * 3) % 12) / 12)
+            samples = [int(12000 * math.sin(2 * math.pi * freq * n / rate)) for n in range(rate)]
+            tones.append(struct.pack(f"<{rate}h", *samples))
+
+        with wave.open(str(path), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            for second in range(int(math.ceil(self.duration))):
+                wav.writeframes(tones[second % len(tones)])
+
+    def fetch_metadata(self, video_id: str) -> Dict:
+        self._request('metadata', video_id)
+        number = self._video_number(video_id)
+
+        # Newer videos have higher numbers, one upload per week
+        upload_date = datetime(2024, 1, 1) + timedelta(weeks=number)
+        return {
+            'id': video_id,
+            'title': f"Fake video {number}",
+            'upload_date': upload_date.strftime('%Y%m%d'),
+            'uploader': f"Fake channel {video_id[:3]}",
+            'channel_id': f"UCfake{video_id[:3]}",
+            'duration': self.duration
+        }
+
+
+def main():
+    """Benchmark the download + transcribe pipeline against the fake source."""
+    num_videos = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    failure_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    model_name = sys.argv[4] if len(sys.argv) > 4 else "tiny"
+
+    os.environ[SOURCE_ENV] = "fake"
+    os.environ[FAKE_ENV['num_videos'][0]] = str(num_videos)
+    os.environ[FAKE_ENV['latency'][0]] = str(latency)
+    os.environ[FAKE_ENV['failure_rate'][0]] = str(failure_rate)
+
+    from process_videos import process_channel
+
+    bench_dir = Path("bench")
+    print(f"[BENCH] {num_videos} videos, {latency}s latency, {failure_rate:.0%} failures, model '{model_name}'")
+    print(f"[BENCH] Output in {bench_dir.absolute()} (delete it to start from scratch)")
+
+    start = time.perf_counter()
+    process_channel("fake://bench-channel", model_name=model_name,
+                    videos_dir=str(bench_dir / "videos"),
+                    transcripts_dir=str(bench_dir / "transcripts"),
+                    # The benchmark indexes into its own directory, never the production index
+                    index_dir=str(bench_dir / "index"))
+    elapsed = time.perf_counter() - start
+
+    transcripts = len(list((bench_dir / "transcripts").glob("*.json")))
+    print(f"[BENCH] {transcripts} transcripts in {elapsed:.1f}s "
+          f"({transcripts / elapsed if elapsed else 0:.2f} videos/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+"""
+Live incremental transcript index with hot reload.
+
+The index is LSM-style:
+
+    index/CURRENT               name of the current main index file
+    index/main-<number>.json    compacted index of all transcripts, with its vocabulary
+    index/deltas/<seq>-<id>.json  one small segment file per new transcript (or
+                                  per chunk appended to a partial transcript)
+
+VideoTranscriber appends a delta whenever it writes a transcript
+(IndexWriter). LiveIndex picks new deltas up within seconds and builds a
+new immutable generation, which is swapped in atomically; searches that
+already hold the previous generation finish on it. A background merge
+compacts the applied deltas into a new main file. The autocomplete
+vocabulary (see vocabulary.py) is updated along with every delta and saved
+with the main file, so loading the index does not rebuild it.
+"""
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from corpora import DEFAULT_CORPORA_DIR
+from vocabulary import Vocabulary
+
+DEFAULT_INDEX_DIR = "index"
+INDEX_DIR_ENV = "VIDEO_INDEX_DIR"
+
+# A compaction lock is stale once the process that wrote it has exited; this age
+# only guards against its PID having been reused by an unrelated process
+STALE_LOCK_SECONDS = 600
+
+# Temporary files written by write_json_atomic: .<name>.<pid>.tmp
+TMP_FILE_PATTERN = re.compile(r"^\..+\.(\d+)\.tmp$")
+
+# Windows process access right and exit code of a running process
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+STILL_ACTIVE = 259
+
+
+def doc_key(video_id: str, channel: str = None) -> str:
+    """Key of a transcript in the index (videos are namespaced by channel)."""
+    return f"{channel or ''}/{video_id}"
+
+
+def make_doc(transcript_data: Dict, channel: str = None, seq: int = 0) -> Dict:
+    """
+    Convert transcript data into an index document.
+
+    Args:
+        transcript_data: Transcript data dictionary
+        channel: Channel the transcript belongs to (None for the flat directory)
+        seq: Sequence number; a document only replaces one with a lower seq
+
+    Returns:
+        Index document (transcript without full_text and video_path)
+    """
+    return {
+        'video_id': transcript_data.get('video_id', 'unknown'),
+        'channel': channel,
+        'seq': seq,
+        'partial': bool(transcript_data.get('partial')),
+        'language': transcript_data.get('language', 'unknown'),
+        'model': transcript_data.get('model'),
+        'segments': transcript_data.get('segments', [])
+    }
+
+
+def pid_alive(pid: int) -> bool:
+    """
+    Check whether a process is still running.
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        True if a process with this ID exists
+    """
+    if pid <= 0:
+        return False
+    if os.name == 'nt':
+        # os.kill() would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # Access denied means the process exists but belongs to someone else
+            return kernel32.GetLastError() == 5
+        exit_code = ctypes.c_ulong()
+        try:
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_json_atomic(path: Path, data):
+    """Write JSON to a hidden temporary file and rename it over path."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+class IndexWriter:
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR):
+        """
+        Initialize the delta writer.
+
+        Args:
+            index_dir: Index directory
+        """
+        self.deltas_dir = Path(index_dir) / "deltas"
+        self.deltas_dir.mkdir(parents=True, exist_ok=True)
+
+    def add(self, transcript_data: Dict, channel: str = None, append: bool = False) -> Path:
+        """
+        Append a transcript to the index as a delta file.
+
+        Args:
+            transcript_data: Transcript data dictionary
+            channel: Channel the transcript belongs to (None for the flat directory)
+            append: Only the new segments of a partial transcript that is
+                already in the index; they are added to its segments instead
+                of replacing the document
+
+        Returns:
+            Path of the delta file
+        """
+        # Nanosecond timestamps order deltas across processes without coordination
+        seq = time.time_ns()
+        doc = make_doc(transcript_data, channel, seq)
+        if append:
+            doc['append'] = True
+        delta_path = self.deltas_dir / f"{seq:020d}-{doc['video_id']}.json"
+        write_json_atomic(delta_path, doc)
+        return delta_path
+
+
+class IndexGeneration:
+    def __init__(self, number: int, docs: Dict[str, Dict], main_name: Optional[str], applied: frozenset):
+        """
+        Immutable snapshot of the index.
+
+        Args:
+            number: Generation number (increases with every swap)
+            docs: Documents by doc_key
+            main_name: Main index file this generation is based on (None if not written yet)
+            applied: Delta file names applied on top of the main index
+        """
+        self.number = number
+        self.docs = docs
+        self.main_name = main_name
+        self.applied = applied
+
+        self.by_channel = {}
+        for doc in docs.values():
+            self.by_channel.setdefault(doc.get('channel'), []).append(doc)
+
+    def get_docs(self, channels: List[str] = None) -> List[Dict]:
+        """
+        Get documents, optionally only those of some channels.
+
+        Args:
+            channels: Channel names to include (None for all documents)
+
+        Returns:
+            List of index documents
+        """
+        if channels is None:
+            return list(self.docs.values())
+        return [doc for channel in channels for doc in self.by_channel.get(channel, [])]
+
+
+class LiveIndex:
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR, transcripts_dir: str = "transcripts",
+                 corpora_dir: str = DEFAULT_CORPORA_DIR, poll_interval: float = 1.0,
+                 compact_threshold: int = 64, compact_interval: float = 300.0):
+        """
+        Initialize the live index.
+
+        Args:
+            index_dir: Index directory
+            transcripts_dir: Flat transcripts directory (used to bootstrap the index)
+            corpora_dir: Root directory holding per-channel corpora (used to bootstrap the index)
+            poll_interval: Seconds between checks for new deltas
+            compact_threshold: Compact once this many deltas have been applied
+            compact_interval: Compact applied deltas at least this often (seconds)
+        """
+        self.index_dir = Path(index_dir)
+        self.deltas_dir = self.index_dir / "deltas"
+        self.deltas_dir.mkdir(parents=True, exist_ok=True)
+        self.transcripts_dir = transcripts_dir
+        self.corpora_dir = corpora_dir
+        self.poll_interval = poll_interval
+        self.compact_threshold = compact_threshold
+        self.compact_interval = compact_interval
+
+        # Readers just take self.current; swapping it is atomic
+        self.current = None
+        self.vocabulary = Vocabulary()
+        # Set once the background thread has loaded the first generation
+        self.ready = threading.Event()
+        # Main index written without its vocabulary (rewritten by the next compaction)
+        self._main_outdated = False
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_compact = time.time()
+
+    def _read_current_name(self) -> Optional[str]:
+        """Read the name of the current main index file."""
+        try:
+            return (self.index_dir / "CURRENT").read_text(encoding='utf-8').strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _list_deltas(self) -> List[str]:
+        """List delta file names in sequence order."""
+        return sorted(p.name for p in self.deltas_dir.glob("*.json") if not p.name.startswith('.'))
+
+    def _bootstrap_docs(self) -> Dict[str, Dict]:
+        """Build documents from the transcript files on disk."""
+        from searcher import TranscriptSearcher
+
+        searcher = TranscriptSearcher(self.transcripts_dir, self.corpora_dir)
+        docs = {}
+        for channel, transcript_path in searcher.get_transcript_files():
+            transcript_data = searcher.load_transcript(transcript_path)
+            if transcript_data:
+                # File mtimes keep later deltas for the same video newer
+                doc = make_doc(transcript_data, channel, transcript_path.stat().st_mtime_ns)
+                docs[doc_key(doc['video_id'], channel)] = doc
+        return docs
+
+    def _load(self, rebuild: bool = False):
+        """Load the main index (bootstrapping it from transcripts if missing) plus all deltas."""
+        main_name = None if rebuild else self._read_current_name()
+        number = self.current.number + 1 if self.current else 0
+
+        vocabulary = None
+        if main_name:
+            with open(self.index_dir / main_name, 'r', encoding='utf-8') as f:
+                main = json.load(f)
+            docs = main['docs']
+            if 'vocabulary' in main:
+                vocabulary = Vocabulary.from_json(main['vocabulary'])
+        else:
+            print("[INDEX] Building index from transcript files...")
+            docs = self._bootstrap_docs()
+
+        # Main files written before the vocabulary was saved with them
+        self._main_outdated = bool(main_name) and vocabulary is None
+        self.vocabulary = vocabulary or Vocabulary.from_transcripts(docs.values())
+        self.current = IndexGeneration(number, docs, main_name, frozenset())
+        self._apply_deltas()
+        print(f"[INDEX] Loaded generation {self.current.number} ({len(self.current.docs)} videos)")
+
+    def _apply_deltas(self) -> bool:
+        """Apply new delta files on top of the current generation and swap it in."""
+        generation = self.current
+        new_deltas = [name for name in self._list_deltas() if name not in generation.applied]
+        if not new_deltas:
+            return False
+
+        docs = dict(generation.docs)
+        applied = set(generation.applied)
+        for name in new_deltas:
+            try:
+                with open(self.deltas_dir / name, 'r', encoding='utf-8') as f:
+                    doc = json.load(f)
+            except Exception as e:
+                print(f"[WARNING] Failed to load index delta {name}: {str(e)}")
+                continue
+
+            key = doc_key(doc['video_id'], doc.get('channel'))
+            existing = docs.get(key)
+            if doc.pop('append', False):
+                # New segments of a partial transcript; ignored once the final one replaced it
+                if existing is not None and existing['partial'] and doc['seq'] > existing['seq']:
+                    docs[key] = dict(existing, seq=doc['seq'], segments=existing['segments'] + doc['segments'])
+                    self.vocabulary.update(None, doc)
+            elif existing is None or doc['seq'] > existing['seq']:
+                docs[key] = doc
+                self.vocabulary.update(existing, doc)
+            applied.add(name)
+
+        self.current = IndexGeneration(generation.number + 1, docs, generation.main_name, frozenset(applied))
+        print(f"[INDEX] Generation {self.current.number}: applied {len(new_deltas)} deltas "
+              f"({len(docs)} videos)")
+        return True
+
+    def refresh(self) -> bool:
+        """
+        Pick up new deltas (or a main index compacted by another process).
+
+        Returns:
+            True if a new generation was swapped in
+        """
+        with self._lock:
+            if self.current is None or self._read_current_name() != self.current.main_name:
+                self._load()
+                return True
+            return self._apply_deltas()
+
+    def _acquire_compact_lock(self) -> bool:
+        """Take the cross-process compaction lock, breaking it if its owner has exited."""
+        lock_path = self.index_dir / "compact.lock"
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return True
+            except FileExistsError:
+                try:
+                    owner = lock_path.read_text(encoding='utf-8').strip()
+                    age = time.time() - lock_path.stat().st_mtime
+                    # An empty lock is still being written by its owner
+                    held = pid_alive(int(owner)) if owner.isdigit() else age < 1.0
+                    if held and age < STALE_LOCK_SECONDS:
+                        return False
+                    print(f"[INDEX] Removing stale compaction lock (pid {owner or 'unknown'})")
+                    lock_path.unlink()
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def _remove_orphaned_files(self):
+        """
+        Remove files left behind by processes that exited mid-write.
+
+        Called while holding the compaction lock: temporary files of exited
+        processes, and main index files that CURRENT no longer names.
+        """
+        current_name = self._read_current_name()
+        for directory in (self.index_dir, self.deltas_dir):
+            for path in directory.iterdir():
+                match = TMP_FILE_PATTERN.match(path.name)
+                orphaned = match and not pid_alive(int(match.group(1)))
+                if directory == self.index_dir and path.name.startswith("main-") and current_name:
+                    orphaned = path.name != current_name
+                if orphaned:
+                    path.unlink(missing_ok=True)
+
+    def compact(self, rebuild: bool = False) -> bool:
+        """
+        Merge the applied deltas into a new main index file.
+
+        Only one process compacts at a time; the others pick the new main
+        index up on their next refresh.
+
+        Args:
+            rebuild: Rebuild the main index from the transcript files first
+
+        Returns:
+            True if a new main index was written
+        """
+        with self._lock:
+            if not self._acquire_compact_lock():
+                return False
+
+            try:
+                self._remove_orphaned_files()
+                if rebuild or self.current is None or self._read_current_name() != self.current.main_name:
+                    self._load(rebuild=rebuild)
+                else:
+                    self._apply_deltas()
+
+                generation = self.current
+                previous = generation.main_name
+                number = int(previous[len("main-"):-len(".json")]) + 1 if previous else 1
+                main_name = f"main-{number:08d}.json"
+
+                write_json_atomic(self.index_dir / main_name,
+                                  {'docs': generation.docs, 'vocabulary': self.vocabulary.to_json()})
+                current_tmp = self.index_dir / f".CURRENT.{os.getpid()}.tmp"
+                current_tmp.write_text(main_name, encoding='utf-8')
+                os.replace(current_tmp, self.index_dir / "CURRENT")
+
+                # The merged deltas and the old main index are no longer needed
+                for name in generation.applied:
+                    (self.deltas_dir / name).unlink(missing_ok=True)
+                if previous:
+                    (self.index_dir / previous).unlink(missing_ok=True)
+
+                self.current = IndexGeneration(generation.number + 1, generation.docs, main_name, frozenset())
+                self._main_outdated = False
+                self._last_compact = time.time()
+                print(f"[INDEX] Compacted {len(generation.applied)} deltas into {main_name}")
+                return True
+            finally:
+                (self.index_dir / "compact.lock").unlink(missing_ok=True)
+
+    def _run(self):
+        """Background loop: load the index, then refresh often and compact when enough deltas piled up."""
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                self.ready.set()
+                pending = len(self.current.applied)
+                overdue = time.time() - self._last_compact >= self.compact_interval
+                due = (pending >= self.compact_threshold or (pending and overdue)
+                       or self.current.main_name is None or self._main_outdated)
+                if due and not self._stop.is_set():
+                    self.compact()
+            except Exception as e:
+                print(f"[ERROR] Index refresh failed: {str(e)}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """
+        Load the index and keep it up to date in a background thread.
+
+        Returns immediately; ready is set once the index has been loaded. Does
+        nothing if the thread is already running. The thread is stopped at
+        interpreter exit, so a compaction in progress is allowed to finish and
+        release its lock instead of being killed.
+        """
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            atexit.unregister(self.stop)
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the background thread, waiting for a refresh or compaction in progress."""
+        self._stop.set()
+        with self._start_lock:
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+
+
+def main():
+    """Main function for standalone execution."""
+    command = sys.argv[1] if len(sys.argv) > 1 else "compact"
+
+    if command not in ("compact", "rebuild"):
+        print("Usage: python live_index.py [compact|rebuild]")
+        return
+
+    index = LiveIndex()
+    if index.compact(rebuild=command == "rebuild"):
+        print(f"[COMPLETE] Index has {len(index.current.docs)} videos")
+    else:
+        print("[ERROR] Another process is compacting the index, try again later")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,40 @@ Skips already downloaded videos and already transcribed videos.
 import sys
 from pathlib import Path
 from downloader import ChannelDownloader
+from live_index import DEFAULT_INDEX_DIR
 from transcriber import VideoTranscriber
 
+# Seconds between upgrade queue scans while the first pass is running
+UPGRADE_POLL_SECONDS = 10.0
 
-def process_channel(channel_url: str, max_videos: int = None, model_name: str = "base"):
+
+def replace_with_placeholder(video_path: Path):
+    """
+    Replace a transcribed video file with an empty placeholder to save space.
+    
+    Args:
+        video_path: Path to the video file
+    """
+    try:
+        # Get the file size before deletion
+        file_size = video_path.stat().st_size
+        file_size_mb = file_size / (1024 * 1024)
+        
+        # Delete the actual video file
+        video_path.unlink()
+        
+        # Create an empty placeholder file
+        video_path.touch()
+        
+        print(f"[CLEANUP] Replaced video with empty placeholder (freed {file_size_mb:.1f} MB)")
+    except Exception as e:
+        print(f"[WARNING] Could not replace video with placeholder: {str(e)}")
+
+
+def process_channel(channel_url: str, max_videos: int = None, model_name: str = "base",
+                    videos_dir: str = "videos", transcripts_dir: str = "transcripts",
+                    upgrade_model: str = None, chunk_seconds: float = None,
+                    channel: str = None, index_dir: str = DEFAULT_INDEX_DIR):
     """
     Process videos from a channel one at a time.
     
@@ -16,6 +46,17 @@ def process_channel(channel_url: str, max_videos: int = None, model_name: str =
         channel_url: URL of the YouTube channel/profile
         max_videos: Maximum number of videos to process (None for all)
         model_name: Whisper model to use for transcription
+        videos_dir: Directory where videos will be saved
+        transcripts_dir: Directory where transcripts will be saved
+        upgrade_model: Tiered mode - while videos are made searchable with the
+            fast model_name, re-transcribe them with this larger model in a
+            background thread (None to disable)
+        chunk_seconds: Transcribe in checkpointed windows of this many seconds so
+            long videos can resume and are searchable before they finish
+        channel: Channel the transcripts belong to in the search index (None
+            for the flat transcripts directory)
+        index_dir: Live search index that new transcripts are appended to
+            (None to only write transcript files)
     """
     print("=" * 80)
     print("VIDEO INDEX - INCREMENTAL PROCESSING")
@@ -23,13 +64,51 @@ def process_channel(channel_url: str, max_videos: int = None, model_name: str =
     print(f"Channel: {channel_url}")
     print(f"Max videos: {max_videos if max_videos else 'All'}")
     print(f"Whisper model: {model_name}")
+    if upgrade_model:
+        print(f"Upgrade model: {upgrade_model}")
     print("=" * 80)
     print()
     
     # Initialize downloader and transcriber
-    downloader = ChannelDownloader()
-    transcriber = VideoTranscriber(model_name=model_name)
+    downloader = ChannelDownloader(output_dir=videos_dir)
+    transcriber = VideoTranscriber(model_name=model_name, videos_dir=videos_dir, transcripts_dir=transcripts_dir,
+                                   chunk_seconds=chunk_seconds, index_dir=index_dir, channel=channel)
+    
+    # Tiered mode: upgrade the fast transcripts in the background, most-searched first
+    upgrader = None
+    if upgrade_model:
+        from upgrader import TranscriptUpgrader
+        upgrader = TranscriptUpgrader(model_name=upgrade_model, corpora=[(videos_dir, transcripts_dir, channel)],
+                                      index_dir=index_dir, chunk_seconds=chunk_seconds)
+        upgrader.start(poll_interval=UPGRADE_POLL_SECONDS)
     
+    try:
+        # In tiered mode the upgrader still needs the media and replaces it with the placeholder
+        _process_videos(channel_url, max_videos, downloader, transcriber, keep_videos=upgrader is not None)
+    except BaseException:
+        # Do not hold up Ctrl+C for the upgrade in progress; transcripts are written atomically
+        if upgrader:
+            upgrader.stop(wait=False)
+        raise
+    
+    if upgrader:
+        print()
+        print(f"[STEP 2] Finishing transcript upgrades to '{upgrade_model}'...")
+        upgrader.finish()
+
+
+def _process_videos(channel_url: str, max_videos: int, downloader: ChannelDownloader,
+                    transcriber: VideoTranscriber, keep_videos: bool = False):
+    """
+    First pass of process_channel: download and transcribe each video not yet transcribed.
+    
+    Args:
+        channel_url: URL of the YouTube channel/profile
+        max_videos: Maximum number of videos to process (None for all)
+        downloader: Channel downloader
+        transcriber: Transcriber for the fast first pass
+        keep_videos: Keep the video files instead of replacing them with placeholders
+    """
     # Get list of videos from channel
     print("[STEP 1] Fetching video list from channel...")
     videos = downloader.get_channel_videos(channel_url)
@@ -109,20 +188,8 @@ def process_channel(channel_url: str, max_videos: int = None, model_name: str =
             processed_count += 1
             
             # Replace video file with empty placeholder to save space
-            try:
-                # Get the file size before deletion
-                file_size = video_path.stat().st_size
-                file_size_mb = file_size / (1024 * 1024)
-                
-                # Delete the actual video file
-                video_path.unlink()
-                
-                # Create an empty placeholder file
-                video_path.touch()
-                
-                print(f"[CLEANUP] Replaced video with empty placeholder (freed {file_size_mb:.1f} MB)")
-            except Exception as e:
-                print(f"[WARNING] Could not replace video with placeholder: {str(e)}")
+            if not keep_videos:
+                replace_with_placeholder(video_path)
         else:
             print(f"[ERROR] Failed to transcribe {video_id}")
             failed_count += 1
@@ -145,6 +212,12 @@ def process_channel(channel_url: str, max_videos: int = None, model_name: str =
 
 def main():
     """Main function for standalone execution."""
+    # Multi-channel mode: process_videos.py --config channels.json
+    if len(sys.argv) > 2 and sys.argv[1] == "--config":
+        from scheduler import run_from_config
+        run_from_config(sys.argv[2])
+        return
+    
     if len(sys.argv) > 1:
         channel_url = sys.argv[1]
     else:
@@ -167,7 +240,20 @@ def main():
     if len(sys.argv) > 3:
         model_name = sys.argv[3]
     
-    process_channel(channel_url, max_videos, model_name)
+    # Check for optional upgrade model (tiered transcription, "none" to disable)
+    upgrade_model = None
+    if len(sys.argv) > 4 and sys.argv[4].lower() != "none":
+        upgrade_model = sys.argv[4]
+    
+    # Check for optional chunk length (checkpointed transcription of long videos)
+    chunk_seconds = None
+    if len(sys.argv) > 5:
+        try:
+            chunk_seconds = float(sys.argv[5])
+        except ValueError:
+            print(f"[WARNING] Invalid chunk_seconds value '{sys.argv[5]}', transcribing in one pass")
+    
+    process_channel(channel_url, max_videos, model_name, upgrade_model=upgrade_model, chunk_seconds=chunk_seconds)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,280 @@
+"""
+Startup-time profile of the entry points.
+
+Every entry point is started in fresh interpreters, from the current
+directory (so against its transcripts and index), or with --corpus against
+a synthetic corpus of that many transcripts:
+
+    cli search         load searcher.py and run one search over the transcript files
+    web server boot    load web_server.py and render the search page (the server
+                       answers from here on; the index loads in the background)
+    web index load     load web_server.py, wait for the live index to load and
+                       answer one search (not held to the startup target)
+    static build import  load build_static.py only; the build itself (loading
+                       every transcript, fetching metadata) is not timed
+
+Every run gets a fresh copy of the index directory, so loading (and any
+compaction it starts) never changes the index being measured.
+
+For each, the cold start time (best of several runs), the import time from
+`python -X importtime` with the slowest imports, and any heavy dependency
+that was imported are reported.
+
+CLI search skips transcript files that do not contain the query, so it stays
+fast for specific queries; a query found in most transcripts still parses
+all of them and grows with the corpus.
+
+Usage: python profile_startup.py [runs] [--corpus num_transcripts]
+"""
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+from live_index import DEFAULT_INDEX_DIR, INDEX_DIR_ENV, LiveIndex
+
+# Entry point name: (code, cold start target in seconds, or None if not held to a target)
+ENTRY_POINTS = {
+    'cli search': (
+        "from searcher import TranscriptSearcher\n"
+        "TranscriptSearcher().search_all('startup profile')\n",
+        1.0
+    ),
+    'web server boot': (
+        "import web_server\n"
+        "with web_server.app.test_request_context('/'):\n"
+        "    web_server.index()\n",
+        1.0
+    ),
+    'web index load': (
+        "import web_server\n"
+        "web_server.live_index.start()\n"
+        "web_server.live_index.ready.wait()\n"
+        "web_server.app.test_client().get('/api/search?q=startup+profile')\n",
+        None
+    ),
+    'static build import': (
+        "import build_static\n",
+        1.0
+    ),
+}
+
+# Dependencies that take long to import; only the code paths that use them should load them
+HEAVY_MODULES = ('yt_dlp', 'whisper', 'torch', 'numpy')
+
+# Shape of the synthetic corpus: segments per transcript, words per segment, vocabulary size
+CORPUS_SEGMENTS = 400
+CORPUS_SEGMENT_WORDS = 15
+CORPUS_VOCABULARY = 40000
+
+HEAVY_MARKER = "[HEAVY]"
+REPORT_HEAVY = (
+    f"import sys\n"
+    f"print({HEAVY_MARKER!r}, ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+)
+
+
+def make_corpus(corpus_dir: Path, num_transcripts: int, seed: int = 0):
+    """
+    Write a synthetic corpus of transcripts with Zipf-distributed words.
+
+    Args:
+        corpus_dir: Directory to create transcripts/ in
+        num_transcripts: Number of transcripts
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = [''.join(rng.choices(letters, k=rng.randint(2, 9))) for _ in range(CORPUS_VOCABULARY)]
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, CORPUS_VOCABULARY + 1):
+        total += 1 / rank
+        cum_weights.append(total)
+
+    transcripts_dir = corpus_dir / "transcripts"
+    transcripts_dir.mkdir(parents=True, exist_ok=True)
+    for number in range(num_transcripts):
+        picks = rng.choices(words, cum_weights=cum_weights, k=CORPUS_SEGMENTS * CORPUS_SEGMENT_WORDS)
+        segments = []
+        for i in range(CORPUS_SEGMENTS):
+            text = ' '.join(picks[i * CORPUS_SEGMENT_WORDS:(i + 1) * CORPUS_SEGMENT_WORDS])
+            segments.append({'id': i, 'start': i * 4.0, 'end': (i + 1) * 4.0, 'text': f" {text}"})
+        video_id = f"synthetic{number:05d}"
+        transcript_data = {
+            'video_id': video_id,
+            'language': 'en',
+            'model': 'base',
+            'segments': segments,
+            'full_text': ' '.join(segment['text'] for segment in segments)
+        }
+        with open(transcripts_dir / f"{video_id}.json", 'w', encoding='utf-8') as f:
+            json.dump(transcript_data, f, ensure_ascii=False, indent=2)
+
+
+def run_entry_point(code: str, importtime: bool = False) -> Tuple[float, str, str]:
+    """
+    Run entry point code in a fresh interpreter, against a copy of the index.
+
+    Args:
+        code: Python code to run
+        importtime: Run with -X importtime
+
+    Returns:
+        Tuple of (wall time in seconds, stdout, stderr)
+    """
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code + REPORT_HEAVY]
+
+    # The modules live next to this script, the data in the current directory
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [script_dir, os.environ.get('PYTHONPATH')])))
+
+    with tempfile.TemporaryDirectory(prefix="profile-index-") as tmp_dir:
+        index_dir = Path(tmp_dir) / "index"
+        source_index = os.environ.get(INDEX_DIR_ENV) or DEFAULT_INDEX_DIR
+        if Path(source_index).is_dir():
+            shutil.copytree(source_index, index_dir)
+        env[INDEX_DIR_ENV] = str(index_dir)
+
+        start = time.perf_counter()
+        result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        elapsed = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return elapsed, result.stdout, result.stderr
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, float, int]]:
+    """
+    Get the imports and their cumulative times from -X importtime output.
+
+    Args:
+        stderr: Standard error of a -X importtime run
+
+    Returns:
+        List of (module, seconds, depth) tuples, slowest first; depth 0 are
+        the modules imported by the entry point code itself, depth 1 the
+        modules they imported, and so on
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        # Nested imports are indented two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(cumulative) / 1e6, depth))
+
+    return sorted(imports, key=lambda item: item[1], reverse=True)
+
+
+def profile_entry_point(code: str, runs: int = 3) -> Dict:
+    """
+    Profile one entry point.
+
+    Args:
+        code: Python code that starts the entry point
+        runs: Number of cold starts to time
+
+    Returns:
+        Dictionary with cold_start, import_time, imports and heavy
+    """
+    cold_start = min(run_entry_point(code)[0] for _ in range(runs))
+    _, stdout, stderr = run_entry_point(code, importtime=True)
+
+    heavy = []
+    for line in stdout.splitlines():
+        if line.startswith(HEAVY_MARKER):
+            heavy = [m for m in line[len(HEAVY_MARKER):].strip().split(',') if m]
+
+    imports = parse_importtime(stderr)
+    return {
+        'cold_start': cold_start,
+        'import_time': sum(seconds for _, seconds, depth in imports if depth == 0),
+        'imports': imports,
+        'heavy': heavy
+    }
+
+
+def main():
+    """Main function for standalone execution."""
+    args = sys.argv[1:]
+    corpus_size = None
+    if '--corpus' in args:
+        i = args.index('--corpus')
+        corpus_size = int(args[i + 1])
+        del args[i:i + 2]
+    runs = int(args[0]) if args else 3
+
+    print("=" * 50)
+    print("Startup Profile")
+    print("=" * 50)
+
+    if corpus_size is not None:
+        corpus_dir = Path(tempfile.mkdtemp(prefix="profile-corpus-"))
+        print(f"\n[INFO] Writing a synthetic corpus of {corpus_size} transcripts to {corpus_dir}...")
+        make_corpus(corpus_dir, corpus_size)
+        # Build the main index once, as a server that has run before would have
+        previous_dir = os.getcwd()
+        os.chdir(corpus_dir)
+        try:
+            LiveIndex().compact()
+            profile_all(runs)
+        finally:
+            os.chdir(previous_dir)
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+    else:
+        profile_all(runs)
+
+
+def profile_all(runs: int):
+    """
+    Profile every entry point from the current directory and print the report.
+
+    Args:
+        runs: Number of cold starts to time per entry point
+    """
+    slow = 0
+    for name, (code, target) in ENTRY_POINTS.items():
+        print(f"\n[PROFILE] {name}")
+        try:
+            profile = profile_entry_point(code, runs)
+        except Exception as e:
+            print(f"  [ERROR] {str(e)}")
+            slow += 1
+            continue
+
+        if target is None:
+            status = "no target"
+        else:
+            status = "OK" if profile['cold_start'] < target else f"SLOW, target {target:.1f}s"
+        print(f"  Cold start:    {profile['cold_start']:.3f}s (best of {runs}) [{status}]")
+        print(f"  Imports:       {profile['import_time']:.3f}s")
+        print(f"  Heavy modules: {', '.join(profile['heavy']) or 'none'}")
+        print("  Slowest imports:")
+        slowest = [(module, seconds, depth) for module, seconds, depth in profile['imports'] if depth <= 1]
+        for module, seconds, depth in slowest[:8]:
+            print(f"    {seconds:.3f}s  {'  ' * depth}{module}")
+
+        if status.startswith("SLOW"):
+            slow += 1
+
+    print()
+    print("=" * 50)
+    if slow:
+        print(f"{slow} entry point(s) slower than their target")
+    else:
+        print("All entry points start within their target")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Multi-channel scheduler that downloads and transcribes videos from many channels.
+Each channel is stored in its own corpus (see corpora.py), while download
+concurrency and transcription workers are shared globally across channels.
+"""
+import json
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict
+from corpora import DEFAULT_CORPORA_DIR, channel_slug, channel_dirs, safe_channel_name
+from downloader import ChannelDownloader
+from live_index import DEFAULT_INDEX_DIR
+from transcriber import VideoTranscriber
+from process_videos import UPGRADE_POLL_SECONDS, replace_with_placeholder
+
+POLICIES = ("fair", "priority")
+
+
+def load_channel_config(config_path: str) -> Dict:
+    """
+    Load a multi-channel configuration file.
+
+    Example:
+        {
+            "corpora_dir": "corpora",
+            "index_dir": "index",
+            "model": "base",
+            "max_downloads": 2,
+            "transcribe_workers": 1,
+            "policy": "fair",
+            "upgrade_model": "medium",
+            "chunk_seconds": 600,
+            "channels": [
+                {"url": "https://www.youtube.com/@channelname", "max_videos": 10},
+                {"url": "https://www.youtube.com/@other", "name": "other", "priority": 5, "weight": 2}
+            ]
+        }
+
+    Args:
+        config_path: Path to the JSON config file
+
+    Returns:
+        Config dictionary with defaults filled in
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    channels = []
+    for entry in config.get('channels', []):
+        if isinstance(entry, str):
+            entry = {'url': entry}
+        if not entry.get('url'):
+            print(f"[WARNING] Skipping channel entry without url: {entry}")
+            continue
+        # Names become directories under corpora_dir and must be searchable by channel
+        name = entry.get('name') or channel_slug(entry['url'])
+        if safe_channel_name(name) != name:
+            print(f"[WARNING] Channel name '{name}' is not a plain directory name, using '{safe_channel_name(name)}'")
+            name = safe_channel_name(name)
+        channels.append({
+            'url': entry['url'],
+            'name': name,
+            'max_videos': entry.get('max_videos'),
+            'priority': entry.get('priority', 0),
+            'weight': max(1, int(entry.get('weight', 1)))
+        })
+
+    return {
+        'corpora_dir': config.get('corpora_dir', DEFAULT_CORPORA_DIR),
+        'index_dir': config.get('index_dir', DEFAULT_INDEX_DIR),
+        'model': config.get('model', 'base'),
+        'max_downloads': config.get('max_downloads', 2),
+        'transcribe_workers': config.get('transcribe_workers', 1),
+        'policy': config.get('policy', 'fair'),
+        'upgrade_model': config.get('upgrade_model'),
+        'chunk_seconds': config.get('chunk_seconds'),
+        'channels': channels
+    }
+
+
+def interleave(channel_jobs: List[List[Dict]], weights: List[int]) -> List[Dict]:
+    """
+    Merge per-channel job lists into one fair-share order.
+
+    Each round takes up to `weight` jobs from every channel, so a channel with
+    thousands of videos cannot starve channels with only a few.
+
+    Args:
+        channel_jobs: One list of jobs per channel, each in channel order
+        weights: Number of jobs each channel contributes per round
+
+    Returns:
+        Single ordered list of jobs
+    """
+    ordered = []
+    positions = [0] * len(channel_jobs)
+    remaining = sum(len(jobs) for jobs in channel_jobs)
+
+    while remaining:
+        for i, jobs in enumerate(channel_jobs):
+            take = jobs[positions[i]:positions[i] + weights[i]]
+            positions[i] += len(take)
+            remaining -= len(take)
+            ordered.extend(take)
+
+    return ordered
+
+
+class ChannelScheduler:
+    def __init__(self, channels: List[Dict], corpora_dir: str = DEFAULT_CORPORA_DIR,
+                 max_downloads: int = 2, transcribe_workers: int = 1,
+                 model_name: str = "base", policy: str = "fair", chunk_seconds: float = None,
+                 index_dir: str = DEFAULT_INDEX_DIR, keep_videos: bool = False):
+        """
+        Initialize the multi-channel scheduler.
+
+        Args:
+            channels: Channel entries with url, name, max_videos, priority and weight
+            corpora_dir: Root directory for per-channel corpora
+            max_downloads: Number of concurrent downloads shared by all channels
+            transcribe_workers: Number of transcription workers shared by all channels
+                (each worker loads its own Whisper model)
+            model_name: Whisper model to use for transcription
+            policy: "fair" to interleave channels by weight, "priority" to
+                drain higher-priority channels first (fair-share within a priority)
+            chunk_seconds: Transcribe in checkpointed windows of this many seconds
+                (see VideoTranscriber)
+            index_dir: Live search index that new transcripts are appended to
+                (None to only write transcript files)
+            keep_videos: Keep the video files after transcription instead of
+                replacing them with placeholders (tiered mode, where the
+                upgrader replaces them once upgraded)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}', expected one of {POLICIES}")
+
+        # A weight below 1 would stall interleave(), so every channel gets at least 1
+        self.channels = [dict(channel, weight=max(1, int(channel.get('weight', 1)))) for channel in channels]
+        self.corpora_dir = corpora_dir
+        self.max_downloads = max(1, max_downloads)
+        self.transcribe_workers = max(1, transcribe_workers)
+        self.model_name = model_name
+        self.policy = policy
+        self.chunk_seconds = chunk_seconds
+        self.index_dir = index_dir
+        self.keep_videos = keep_videos
+
+        # Downloaded-but-not-yet-transcribed videos are capped so the download
+        # pool cannot fill the disk while transcription falls behind
+        self._backlog = threading.BoundedSemaphore(self.max_downloads + self.transcribe_workers)
+        self._transcribe_queue = queue.PriorityQueue()
+        self._stats_lock = threading.Lock()
+        self.stats = {'processed': 0, 'skipped': 0, 'failed': 0}
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def plan(self) -> List[Dict]:
+        """
+        Fetch every channel listing and build the global job order.
+
+        Returns:
+            Ordered list of jobs (one per video that still needs a transcript)
+        """
+        channel_jobs = []
+        for channel in self.channels:
+            videos_dir, transcripts_dir = channel_dirs(channel['name'], self.corpora_dir)
+            downloader = ChannelDownloader(output_dir=str(videos_dir))
+            transcripts_dir.mkdir(parents=True, exist_ok=True)
+
+            print(f"[PLAN] {channel['name']}: fetching video list...")
+            videos = downloader.get_channel_videos(channel['url'])
+
+            max_videos = channel.get('max_videos')
+            if max_videos is not None and max_videos > 0:
+                videos = videos[:max_videos]
+
+            jobs = []
+            for video in videos:
+                if (transcripts_dir / f"{video['id']}.json").exists():
+                    self._count('skipped')
+                    continue
+                jobs.append({
+                    'channel': channel,
+                    'video': video,
+                    'downloader': downloader,
+                    'videos_dir': videos_dir,
+                    'transcripts_dir': transcripts_dir
+                })
+
+            print(f"[PLAN] {channel['name']}: {len(jobs)} of {len(videos)} videos need processing")
+            channel_jobs.append(jobs)
+
+        if self.policy == "priority":
+            # Strict ordering between priority levels, fair-share inside each level
+            ordered = []
+            levels = sorted({c.get('priority', 0) for c in self.channels}, reverse=True)
+            for level in levels:
+                indices = [i for i, c in enumerate(self.channels) if c.get('priority', 0) == level]
+                ordered.extend(interleave([channel_jobs[i] for i in indices],
+                                          [self.channels[i].get('weight', 1) for i in indices]))
+        else:
+            ordered = interleave(channel_jobs, [c.get('weight', 1) for c in self.channels])
+
+        for rank, job in enumerate(ordered):
+            job['rank'] = rank
+        return ordered
+
+    def _download(self, job: Dict):
+        """Download one job's video and hand it to the transcription queue."""
+        channel_name = job['channel']['name']
+        video_id = job['video']['id']
+        video_path = job['videos_dir'] / f"{video_id}.mp4"
+
+        self._backlog.acquire()
+        queued = False
+
+        try:
+            if video_path.exists() and video_path.stat().st_size == 0:
+                print(f"[SKIP] {channel_name}/{video_id}: placeholder indicates completion")
+                self._count('skipped')
+                return
+
+            if not video_path.exists():
+                print(f"[DOWNLOAD] {channel_name}/{video_id}: {job['video'].get('title', video_id)}")
+                if not job['downloader'].download_video(job['video']['url'], video_id):
+                    print(f"[ERROR] {channel_name}/{video_id}: download failed, skipping...")
+                    self._count('failed')
+                    return
+
+            job['video_path'] = video_path
+            self._transcribe_queue.put((job['rank'], 0, job))
+            queued = True
+        except Exception as e:
+            print(f"[ERROR] {channel_name}/{video_id}: {str(e)}")
+            self._count('failed')
+        finally:
+            # Queued jobs release their slot once transcribed; everything else releases it here
+            if not queued:
+                self._backlog.release()
+
+    def _transcribe_worker(self):
+        """Transcribe queued videos until a stop sentinel arrives."""
+        transcribers = {}
+        model = None
+
+        while True:
+            _, _, job = self._transcribe_queue.get()
+            if job is None:
+                return
+
+            try:
+                # One model per worker, shared by that worker's per-channel transcribers
+                key = str(job['transcripts_dir'])
+                if key not in transcribers:
+                    transcribers[key] = VideoTranscriber(model_name=self.model_name,
+                                                         videos_dir=str(job['videos_dir']),
+                                                         transcripts_dir=str(job['transcripts_dir']),
+                                                         model=model,
+                                                         chunk_seconds=self.chunk_seconds,
+                                                         index_dir=self.index_dir,
+                                                         channel=job['channel']['name'])
+                    model = transcribers[key].model
+
+                channel_name = job['channel']['name']
+                video_id = job['video']['id']
+                print(f"[TRANSCRIBE] {channel_name}/{video_id}")
+
+                if transcribers[key].transcribe_video(job['video_path']):
+                    self._count('processed')
+                    if not self.keep_videos:
+                        replace_with_placeholder(job['video_path'])
+                else:
+                    print(f"[ERROR] {channel_name}/{video_id}: transcription failed")
+                    self._count('failed')
+            except Exception as e:
+                # Keep the worker alive so queued jobs still release their backlog slots
+                print(f"[ERROR] Transcription worker error: {str(e)}")
+                self._count('failed')
+            finally:
+                self._backlog.release()
+
+    def run(self) -> Dict:
+        """
+        Process all configured channels.
+
+        Returns:
+            Dictionary with processed, skipped and failed counts
+        """
+        print("=" * 80)
+        print("VIDEO INDEX - MULTI-CHANNEL PROCESSING")
+        print("=" * 80)
+        print(f"Channels: {len(self.channels)}")
+        print(f"Corpora directory: {Path(self.corpora_dir).absolute()}")
+        print(f"Policy: {self.policy}")
+        print(f"Download concurrency: {self.max_downloads}")
+        print(f"Transcription workers: {self.transcribe_workers}")
+        print(f"Whisper model: {self.model_name}")
+        print("=" * 80)
+        print()
+
+        jobs = self.plan()
+        print(f"\n[INFO] {len(jobs)} videos scheduled across {len(self.channels)} channels\n")
+
+        workers = [threading.Thread(target=self._transcribe_worker, daemon=True)
+                   for _ in range(self.transcribe_workers)]
+        for worker in workers:
+            worker.start()
+
+        with ThreadPoolExecutor(max_workers=self.max_downloads) as pool:
+            for job in jobs:
+                pool.submit(self._download, job)
+
+        # Sentinels sort after every real job
+        for i in range(len(workers)):
+            self._transcribe_queue.put((float('inf'), i, None))
+        for worker in workers:
+            worker.join()
+
+        print("=" * 80)
+        print("PROCESSING COMPLETE")
+        print("=" * 80)
+        print(f"Newly processed: {self.stats['processed']}")
+        print(f"Already processed (skipped): {self.stats['skipped']}")
+        print(f"Failed: {self.stats['failed']}")
+        print("=" * 80)
+        return self.stats
+
+
+def run_from_config(config_path: str) -> Dict:
+    """
+    Run the scheduler using a multi-channel config file.
+
+    Args:
+        config_path: Path to the JSON config file (see load_channel_config)
+
+    Returns:
+        Dictionary with processed, skipped and failed counts
+    """
+    config = load_channel_config(config_path)
+
+    if not config['channels']:
+        print(f"[ERROR] No channels configured in {config_path}")
+        return {'processed': 0, 'skipped': 0, 'failed': 0}
+
+    scheduler = ChannelScheduler(
+        config['channels'],
+        corpora_dir=config['corpora_dir'],
+        max_downloads=config['max_downloads'],
+        transcribe_workers=config['transcribe_workers'],
+        model_name=config['model'],
+        policy=config['policy'],
+        chunk_seconds=config['chunk_seconds'],
+        index_dir=config['index_dir'],
+        # The upgrader re-transcribes from the kept media, then replaces it with a placeholder
+        keep_videos=bool(config['upgrade_model'])
+    )
+
+    # Tiered mode: upgrade the fast transcripts of all channels in the background, most-searched first
+    upgrader = None
+    if config['upgrade_model']:
+        from upgrader import TranscriptUpgrader
+        corpora = [channel_dirs(channel['name'], config['corpora_dir']) + (channel['name'],)
+                   for channel in config['channels']]
+        upgrader = TranscriptUpgrader(model_name=config['upgrade_model'], corpora=corpora,
+                                      index_dir=config['index_dir'], chunk_seconds=config['chunk_seconds'])
+        upgrader.start(poll_interval=UPGRADE_POLL_SECONDS)
+
+    try:
+        stats = scheduler.run()
+    except BaseException:
+        if upgrader:
+            upgrader.stop(wait=False)
+        raise
+
+    if upgrader:
+        print(f"\n[INFO] Finishing transcript upgrades to '{config['upgrade_model']}'...")
+        upgrader.finish()
+
+    return stats
+
+
+def main():
+    """Main function for standalone execution."""
+    config_path = sys.argv[1] if len(sys.argv) > 1 else "channels.json"
+
+    if not Path(config_path).exists():
+        print(f"[ERROR] Config file not found: {config_path}")
+        return
+
+    run_from_config(config_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Search-hit log used to prioritize transcript upgrades.
+Records how often and how recently each video appeared in search results.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable
+
+DEFAULT_HITS_PATH = "search_hits.json"
+
+
+class SearchHitLog:
+    def __init__(self, path: str = DEFAULT_HITS_PATH, flush_interval: float = 5.0):
+        """
+        Initialize the search-hit log.
+
+        Args:
+            path: JSON file where hit counts are stored
+            flush_interval: Minimum seconds between writes to disk
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.time()
+
+    def _read(self) -> Dict[str, Dict]:
+        """Read the hit statistics currently stored on disk."""
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[WARNING] Failed to load search hits from {self.path}: {str(e)}")
+            return {}
+
+    @staticmethod
+    def _merge(hits: Dict[str, Dict], pending: Dict[str, Dict]):
+        """Add pending hit counts into a hit statistics dictionary."""
+        for video_id, new in pending.items():
+            entry = hits.setdefault(video_id, {'count': 0, 'last_hit': 0})
+            entry['count'] += new['count']
+            entry['last_hit'] = max(entry['last_hit'], new['last_hit'])
+
+    def load(self) -> Dict[str, Dict]:
+        """
+        Load hit statistics from disk, including hits not yet flushed.
+
+        Returns:
+            Dictionary mapping video_id to {'count': int, 'last_hit': float}
+        """
+        hits = self._read()
+        with self._lock:
+            self._merge(hits, self._pending)
+        return hits
+
+    def record(self, video_ids: Iterable[str]):
+        """
+        Record one search hit for each video.
+
+        Args:
+            video_ids: IDs of the videos that matched a search
+        """
+        now = time.time()
+        with self._lock:
+            self._merge(self._pending, {video_id: {'count': 1, 'last_hit': now} for video_id in set(video_ids)})
+            due = now - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Merge pending hits into the file on disk (atomic replace)."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.time()
+
+        if not pending:
+            return
+
+        hits = self._read()
+        self._merge(hits, pending)
+
+        try:
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(hits, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"[WARNING] Failed to save search hits to {self.path}: {str(e)}")
@@ -3,23 +3,112 @@ Transcript search module for finding text in video transcripts with timestamps.
 """
 import json
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import re
+from corpora import DEFAULT_CORPORA_DIR, channel_dirs, list_channels
+from search_hits import DEFAULT_HITS_PATH, SearchHitLog
+
+
+# Results returned by semantic search when no maximum is given
+DEFAULT_SEMANTIC_RESULTS = 20
+
+# Characters that re.IGNORECASE matches to an ASCII letter but str.lower() does not map to it
+IGNORECASE_FOLDS = str.maketrans({'\u0131': 'i', '\u017f': 's'})
 
 
 class TranscriptSearcher:
-    def __init__(self, transcripts_dir: str = "transcripts"):
+    def __init__(self, transcripts_dir: str = "transcripts", corpora_dir: str = DEFAULT_CORPORA_DIR,
+                 hits_path: str = None, index=None, semantic_dir: str = "semantic"):
         """
         Initialize the transcript searcher.
         
         Args:
             transcripts_dir: Directory containing transcript JSON files
+            corpora_dir: Root directory holding per-channel corpora
+            hits_path: Record matched videos to this search-hit log, used to
+                prioritize transcript upgrades (None to disable)
+            index: LiveIndex to search in memory instead of reading the
+                transcript files for every query (None to read the files)
+            semantic_dir: Semantic index directory (see semantic.py)
         """
         self.transcripts_dir = Path(transcripts_dir)
+        self.corpora_dir = Path(corpora_dir)
+        self.hit_log = SearchHitLog(hits_path) if hits_path else None
+        self.index = index
+        self.semantic_dir = semantic_dir
+        self.semantic_index = None
         
-        if not self.transcripts_dir.exists():
+        if not self.transcripts_dir.exists() and not self.corpora_dir.exists():
             print(f"[ERROR] Transcripts directory not found: {self.transcripts_dir}")
     
+    def get_transcript_files(self, channels: List[str] = None) -> List[Tuple[Optional[str], Path]]:
+        """
+        List transcript files, optionally restricted to a set of channels.
+        
+        Only the transcripts directories of the requested channels are listed,
+        so other channels are never scanned.
+        
+        Args:
+            channels: Channel names to include (None for the flat transcripts
+                directory plus every channel corpus)
+            
+        Returns:
+            List of (channel, transcript_path) tuples; channel is None for the
+            flat transcripts directory
+        """
+        files = []
+        
+        if channels is None:
+            files.extend((None, path) for path in self.transcripts_dir.glob("*.json"))
+            channels = list_channels(str(self.corpora_dir))
+        
+        for channel in channels:
+            # Channel names come from user input, keep them inside the corpora root
+            if channel != Path(channel).name or channel.startswith('.'):
+                print(f"[WARNING] Ignoring invalid channel name: {channel}")
+                continue
+            _, transcripts_dir = channel_dirs(channel, str(self.corpora_dir))
+            files.extend((channel, path) for path in transcripts_dir.glob("*.json"))
+        
+        # Partial transcripts (<id>.partial.json) are searchable while a long video
+        # is being transcribed, until the final <id>.json replaces them
+        names = {path.name for _, path in files}
+        return [(channel, path) for channel, path in files
+                if not (path.name.endswith(".partial.json")
+                        and path.name[:-len(".partial.json")] + ".json" in names)]
+    
+    def may_contain(self, transcript_path: Path, query: str, case_sensitive: bool = False) -> bool:
+        """
+        Check the raw transcript file for a query before parsing it.
+        
+        Plain ASCII queries appear verbatim in the JSON text whenever a segment
+        matches, so files without them can be skipped without being parsed.
+        Other queries (and queries with quotes, backslashes or slashes) may be
+        escaped in the JSON and always return True.
+        
+        Args:
+            transcript_path: Path to transcript file
+            query: Search query string
+            case_sensitive: Whether the search is case-sensitive
+            
+        Returns:
+            False only if no segment of the transcript can match
+        """
+        if not (query.isascii() and query.isprintable()) or any(c in query for c in '"\\/'):
+            return True
+        try:
+            with open(transcript_path, 'r', encoding='utf-8') as f:
+                raw = f.read()
+        except Exception:
+            return True  # load_transcript reports the error
+        
+        if case_sensitive:
+            return query in raw
+        raw = raw.lower()
+        if '\u0131' in raw or '\u017f' in raw:
+            raw = raw.translate(IGNORECASE_FOLDS)
+        return query.lower() in raw
+    
     def load_transcript(self, transcript_path: Path) -> Dict:
         """
         Load a transcript JSON file.
@@ -56,7 +145,8 @@ class TranscriptSearcher:
         else:
             return f"{minutes:02d}:{secs:02d}"
     
-    def search_transcript(self, transcript_data: Dict, query: str, case_sensitive: bool = False) -> List[Dict]:
+    def search_transcript(self, transcript_data: Dict, query: str, case_sensitive: bool = False,
+                          channel: str = None) -> List[Dict]:
         """
         Search for a query string in a transcript.
         
@@ -64,6 +154,7 @@ class TranscriptSearcher:
             transcript_data: Transcript data dictionary
             query: Search query string
             case_sensitive: Whether to perform case-sensitive search
+            channel: Channel the transcript belongs to (None for the flat directory)
             
         Returns:
             List of matching segments with timestamps
@@ -87,6 +178,7 @@ class TranscriptSearcher:
             if pattern.search(text):
                 matches.append({
                     'video_id': video_id,
+                    'channel': channel,
                     'start': segment['start'],
                     'end': segment['end'],
                     'timestamp': self.format_timestamp(segment['start']),
@@ -96,7 +188,8 @@ class TranscriptSearcher:
         
         return matches
     
-    def search_all(self, query: str, case_sensitive: bool = False, max_results: int = None) -> List[Dict]:
+    def search_all(self, query: str, case_sensitive: bool = False, max_results: int = None,
+                   channels: List[str] = None) -> List[Dict]:
         """
         Search for a query across all transcripts.
         
@@ -104,6 +197,7 @@ class TranscriptSearcher:
             query: Search query string
             case_sensitive: Whether to perform case-sensitive search
             max_results: Maximum number of results to return (None for all)
+            channels: Only search these channels (None for all transcripts)
             
         Returns:
             List of all matching segments across all videos
@@ -112,21 +206,32 @@ class TranscriptSearcher:
             print("[ERROR] No search query provided")
             return []
         
-        transcript_files = list(self.transcripts_dir.glob("*.json"))
-        
-        if not transcript_files:
-            print(f"[ERROR] No transcript files found in {self.transcripts_dir}")
-            return []
-        
-        print(f"[INFO] Searching {len(transcript_files)} transcripts for: '{query}'")
-        
         all_matches = []
         
-        for transcript_path in transcript_files:
-            transcript_data = self.load_transcript(transcript_path)
-            if transcript_data:
-                matches = self.search_transcript(transcript_data, query, case_sensitive)
-                all_matches.extend(matches)
+        if self.index is not None:
+            # Hold one generation for the whole query; a concurrent swap does not affect it
+            docs = self.index.current.get_docs(channels)
+            print(f"[INFO] Searching {len(docs)} indexed transcripts for: '{query}'")
+            
+            for doc in docs:
+                all_matches.extend(self.search_transcript(doc, query, case_sensitive, doc.get('channel')))
+        else:
+            transcript_files = self.get_transcript_files(channels)
+            
+            if not transcript_files:
+                print(f"[ERROR] No transcript files found in {self.transcripts_dir}")
+                return []
+            
+            print(f"[INFO] Searching {len(transcript_files)} transcripts for: '{query}'")
+            
+            for channel, transcript_path in transcript_files:
+                # Most transcripts do not contain the query; skip parsing those
+                if not self.may_contain(transcript_path, query, case_sensitive):
+                    continue
+                transcript_data = self.load_transcript(transcript_path)
+                if transcript_data:
+                    matches = self.search_transcript(transcript_data, query, case_sensitive, channel)
+                    all_matches.extend(matches)
         
         # Sort by video_id and timestamp
         all_matches.sort(key=lambda x: (x['video_id'], x['start']))
@@ -135,8 +240,55 @@ class TranscriptSearcher:
         if max_results and len(all_matches) > max_results:
             all_matches = all_matches[:max_results]
         
+        if self.hit_log:
+            self.hit_log.record(match['video_id'] for match in all_matches)
+        
         return all_matches
     
+    def search_semantic(self, query: str, max_results: int = None,
+                        channels: List[str] = None) -> List[Dict]:
+        """
+        Search for segments similar in meaning to a query (see semantic.py).
+        
+        Args:
+            query: Search query string
+            max_results: Maximum number of results to return (None for DEFAULT_SEMANTIC_RESULTS)
+            channels: Only search these channels (None for all transcripts)
+            
+        Returns:
+            List of matching windows of segments, most similar first, each with a score
+            
+        Raises:
+            FileNotFoundError: If the semantic index has not been built
+        """
+        if not query:
+            print("[ERROR] No search query provided")
+            return []
+        
+        # numpy is only needed for semantic search, so import it on first use
+        if self.semantic_index is None:
+            from semantic import SemanticIndex
+            self.semantic_index = SemanticIndex(self.semantic_dir)
+        
+        print(f"[INFO] Semantic search for: '{query}'")
+        windows = self.semantic_index.search(query, max_results or DEFAULT_SEMANTIC_RESULTS, channels)
+        
+        matches = [{
+            'video_id': window['video_id'],
+            'channel': window['channel'],
+            'start': window['start'],
+            'end': window['end'],
+            'timestamp': self.format_timestamp(window['start']),
+            'text': window['text'],
+            'youtube_url': f"https://www.youtube.com/watch?v={window['video_id']}&t={int(window['start'])}s",
+            'score': round(window['score'], 4)
+        } for window in windows]
+        
+        if self.hit_log:
+            self.hit_log.record(match['video_id'] for match in matches)
+        
+        return matches
+    
     def display_results(self, matches: List[Dict]):
         """
         Display search results in a formatted way.
@@ -162,7 +314,8 @@ class TranscriptSearcher:
                 print(f"\nVideo: {video_id}")
                 current_video = video_id
             
-            print(f"\n[{i}] Timestamp: {match['timestamp']}")
+            score = f" (score {match['score']:.2f})" if 'score' in match else ""
+            print(f"\n[{i}] Timestamp: {match['timestamp']}{score}")
             print(f"    Text: {match['text']}")
             print(f"    URL: {match['youtube_url']}")
         
@@ -173,8 +326,22 @@ def main():
     """Main function for standalone execution."""
     import sys
     
-    if len(sys.argv) > 1:
-        query = ' '.join(sys.argv[1:])
+    # Optional flags: searcher.py [--semantic] [--channel name [--channel other]] query
+    args = sys.argv[1:]
+    channels = []
+    semantic = False
+    while args and args[0] in ('--channel', '--semantic'):
+        if args[0] == '--semantic':
+            semantic = True
+            args = args[1:]
+        elif len(args) > 1:
+            channels.append(args[1])
+            args = args[2:]
+        else:
+            break
+    
+    if args:
+        query = ' '.join(args)
     else:
         query = input("Enter search query: ").strip()
     
@@ -182,8 +349,16 @@ def main():
         print("[ERROR] No search query provided")
         return
     
-    searcher = TranscriptSearcher()
-    matches = searcher.search_all(query)
+    searcher = TranscriptSearcher(hits_path=DEFAULT_HITS_PATH)
+    if semantic:
+        try:
+            matches = searcher.search_semantic(query, channels=channels or None)
+        except FileNotFoundError as e:
+            print(f"[ERROR] {str(e)}")
+            return
+    else:
+        matches = searcher.search_all(query, channels=channels or None)
+    searcher.hit_log.flush()
     searcher.display_results(matches)
     
     print(f"\n[COMPLETE] Search finished. Total matches: {len(matches)}")
@@ -0,0 +1,553 @@
+"""
+Semantic search over transcript segments.
+
+Transcripts are cut into windows of a few consecutive segments. Every window
+is embedded offline into a dense vector with TF-IDF followed by a truncated
+SVD (latent semantic analysis), so windows about the same topic end up close
+together even when they share none of the query's words. The vectors are
+stored in a memory-mapped float32 matrix and scored against queries in
+batches, one matrix product per batch, keeping only the top hits of each.
+
+    semantic/CURRENT                    name of the current build directory
+    semantic/build-<n>/meta.json        window and dimension counts, channel names
+    semantic/build-<n>/terms.json       vocabulary (row order of idf and projection)
+    semantic/build-<n>/idf.npy          inverse document frequency of every term
+    semantic/build-<n>/projection.npy   terms x dimensions SVD projection
+    semantic/build-<n>/vectors.npy      windows x dimensions unit vectors
+    semantic/build-<n>/channels.npy     channel number of every window
+    semantic/build-<n>/windows.jsonl    video_id, channel, start, end, text of every window
+    semantic/build-<n>/offsets.npy      byte offset of every line in windows.jsonl
+
+Build the index (again after adding transcripts) with:
+
+    python semantic.py build [dimensions]
+"""
+import heapq
+import json
+import os
+import shutil
+import sys
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+from tqdm import tqdm
+from corpora import DEFAULT_CORPORA_DIR
+from vocabulary import tokenize
+
+DEFAULT_SEMANTIC_DIR = "semantic"
+DEFAULT_DIMENSIONS = 256
+
+# Windows of 3 segments starting every 2 segments, so each window shares one
+# segment with the next and phrases split across segments are still found
+WINDOW_SEGMENTS = 3
+WINDOW_STRIDE = 2
+
+# Vocabulary limits (only applied to corpora of at least MIN_WINDOWS_FOR_LIMITS windows)
+MAX_TERMS = 100000
+MIN_DF = 2
+MAX_DF_RATIO = 0.5
+MIN_WINDOWS_FOR_LIMITS = 1000
+
+# Windows used to fit the SVD projection
+SVD_SAMPLE = 50000
+SVD_OVERSAMPLE = 10
+SVD_POWER_ITERATIONS = 2
+
+# Windows embedded per batch while building, vectors scored per batch while searching
+EMBED_BATCH = 4096
+SEARCH_BATCH = 65536
+
+# Non-zeros multiplied per step of a sparse-dense product (bounds temporary memory)
+CHUNK_NNZ = 1 << 16
+
+
+def iter_windows(segments: List[Dict], size: int = WINDOW_SEGMENTS,
+                 stride: int = WINDOW_STRIDE) -> Iterator[Tuple[float, float, str]]:
+    """
+    Cut transcript segments into windows of consecutive segments.
+
+    Args:
+        segments: Transcript segments (start, end, text)
+        size: Segments per window
+        stride: Segments between the starts of consecutive windows
+
+    Returns:
+        Iterator of (start, end, text) tuples; the last window always ends
+        with the last segment
+    """
+    if not segments:
+        return
+
+    last_start = max(len(segments) - size, 0)
+    starts = list(range(0, last_start + 1, stride))
+    if starts[-1] != last_start:
+        starts.append(last_start)
+
+    for i in starts:
+        window = segments[i:i + size]
+        yield window[0]['start'], window[-1]['end'], ' '.join(s['text'].strip() for s in window)
+
+
+def csr_dot(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, dense: np.ndarray) -> np.ndarray:
+    """
+    Multiply a sparse matrix in CSR form by a dense matrix.
+
+    Args:
+        indptr: Row pointers (n_rows + 1)
+        indices: Column of every non-zero
+        data: Value of every non-zero
+        dense: Dense matrix with one row per column of the sparse matrix
+
+    Returns:
+        Dense float32 product (n_rows x dense columns)
+    """
+    n_rows = len(indptr) - 1
+    out = np.zeros((n_rows, dense.shape[1]), dtype=np.float32)
+
+    row = 0
+    while row < n_rows:
+        # Take as many rows as fit in CHUNK_NNZ non-zeros (at least one)
+        end = int(np.searchsorted(indptr, indptr[row] + CHUNK_NNZ, side='right')) - 1
+        end = min(max(end, row + 1), n_rows)
+        lo, hi = indptr[row], indptr[end]
+
+        # reduceat needs non-empty groups; empty rows stay zero
+        rows = row + np.flatnonzero(np.diff(indptr[row:end + 1]))
+        if len(rows):
+            products = data[lo:hi, None] * dense[indices[lo:hi]]
+            out[rows] = np.add.reduceat(products, indptr[rows] - lo, axis=0)
+        row = end
+
+    return out
+
+
+def csr_transpose(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                  n_cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Transpose a sparse matrix in CSR form.
+
+    Args:
+        indptr: Row pointers
+        indices: Column of every non-zero
+        data: Value of every non-zero
+        n_cols: Number of columns
+
+    Returns:
+        Tuple of (indptr, indices, data) of the transpose
+    """
+    rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+    order = np.argsort(indices, kind='stable')
+    t_indptr = np.zeros(n_cols + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n_cols), out=t_indptr[1:])
+    return t_indptr, rows[order], data[order]
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale the rows of a matrix to unit length in place (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def tfidf_rows(texts: List[str], term_ids: Dict[str, int],
+               idf: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute unit-length TF-IDF rows (sublinear term frequency) in CSR form.
+
+    Args:
+        texts: Texts to convert, one row each
+        term_ids: Column of every vocabulary term
+        idf: Inverse document frequency of every column
+
+    Returns:
+        Tuple of (indptr, indices, data)
+    """
+    indptr = [0]
+    indices = []
+    counts = []
+    for text in texts:
+        tf = Counter(term_ids[term] for term in tokenize(text) if term in term_ids)
+        indices.extend(tf.keys())
+        counts.extend(tf.values())
+        indptr.append(len(indices))
+
+    indptr = np.array(indptr, dtype=np.int64)
+    indices = np.array(indices, dtype=np.int32)
+    data = (1 + np.log(np.array(counts, dtype=np.float32))) * idf[indices]
+
+    # Unit-length rows, so long windows do not dominate the SVD fit
+    rows = np.flatnonzero(np.diff(indptr))
+    if len(rows):
+        norms = np.sqrt(np.add.reduceat(data * data, indptr[rows]))
+        data /= np.repeat(norms, np.diff(indptr)[rows])
+
+    return indptr, indices, data
+
+
+def fit_projection(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_terms: int,
+                   dimensions: int, seed: int = 0) -> np.ndarray:
+    """
+    Fit a truncated SVD projection with a randomized range finder.
+
+    Args:
+        indptr: Row pointers of the sample TF-IDF matrix
+        indices: Column of every non-zero
+        data: Value of every non-zero
+        n_terms: Number of columns (vocabulary size)
+        dimensions: Number of dimensions to keep
+        seed: Random seed
+
+    Returns:
+        terms x dimensions float32 projection (top right singular vectors);
+        fewer dimensions if the sample is too small
+    """
+    n_rows = len(indptr) - 1
+    rank = max(1, min(dimensions, n_rows, n_terms))
+    size = min(rank + SVD_OVERSAMPLE, n_rows, n_terms)
+    t_indptr, t_indices, t_data = csr_transpose(indptr, indices, data, n_terms)
+
+    rng = np.random.default_rng(seed)
+    q = csr_dot(indptr, indices, data, rng.standard_normal((n_terms, size), dtype=np.float32))
+    for _ in range(SVD_POWER_ITERATIONS):
+        q, _ = np.linalg.qr(q)
+        z, _ = np.linalg.qr(csr_dot(t_indptr, t_indices, t_data, q))
+        q = csr_dot(indptr, indices, data, z)
+    q, _ = np.linalg.qr(q)
+
+    # The sample matrix is approximately q @ b.T, so its right singular vectors are b's
+    b = csr_dot(t_indptr, t_indices, t_data, q)
+    _, _, vt = np.linalg.svd(b.T, full_matrices=False)
+    return np.ascontiguousarray(vt[:rank].T, dtype=np.float32)
+
+
+class SemanticBuild:
+    def __init__(self, build_dir: Path):
+        """
+        Open a semantic index build; the vectors are memory-mapped, not read.
+
+        Args:
+            build_dir: Build directory
+        """
+        self.name = build_dir.name
+        self.build_dir = build_dir
+
+        with open(build_dir / "meta.json", 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(build_dir / "terms.json", 'r', encoding='utf-8') as f:
+            self.term_ids = {term: i for i, term in enumerate(json.load(f))}
+
+        self.idf = np.load(build_dir / "idf.npy")
+        self.projection = np.load(build_dir / "projection.npy")
+        self.vectors = np.load(build_dir / "vectors.npy", mmap_mode='r')
+        self.channels = np.load(build_dir / "channels.npy")
+        self.offsets = np.load(build_dir / "offsets.npy")
+        self.channel_numbers = {name: i for i, name in enumerate(self.meta['channels'])}
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into unit vectors (zero vectors for texts without known terms).
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 matrix with one row per text
+        """
+        return normalize_rows(csr_dot(*tfidf_rows(texts, self.term_ids, self.idf), self.projection))
+
+    def read_windows(self, window_ids: List[int]) -> List[Dict]:
+        """
+        Read windows by number from windows.jsonl.
+
+        Args:
+            window_ids: Window numbers
+
+        Returns:
+            List of window dictionaries
+        """
+        windows = []
+        with open(self.build_dir / "windows.jsonl", 'rb') as f:
+            for window_id in window_ids:
+                f.seek(int(self.offsets[window_id]))
+                windows.append(json.loads(f.readline()))
+        return windows
+
+
+class SemanticIndex:
+    def __init__(self, index_dir: str = DEFAULT_SEMANTIC_DIR):
+        """
+        Initialize the semantic index.
+
+        Args:
+            index_dir: Semantic index directory
+        """
+        self.index_dir = Path(index_dir)
+        # Readers just take self.current; swapping it is atomic
+        self.current = None
+
+    def _read_current_name(self):
+        """Read the name of the current build directory."""
+        try:
+            return (self.index_dir / "CURRENT").read_text(encoding='utf-8').strip() or None
+        except FileNotFoundError:
+            return None
+
+    def open(self) -> SemanticBuild:
+        """
+        Get the current build, opening it again if a newer build was swapped in.
+
+        Returns:
+            SemanticBuild instance
+
+        Raises:
+            FileNotFoundError: If the index has not been built
+        """
+        name = self._read_current_name()
+        if name is None:
+            raise FileNotFoundError(f"No semantic index in {self.index_dir}, "
+                                    f"build it with: python semantic.py build")
+
+        current = self.current
+        if current is None or current.name != name:
+            current = SemanticBuild(self.index_dir / name)
+            self.current = current
+        return current
+
+    def build(self, transcripts_dir: str = "transcripts", corpora_dir: str = DEFAULT_CORPORA_DIR,
+              dimensions: int = DEFAULT_DIMENSIONS, seed: int = 0) -> int:
+        """
+        Build the index from the transcript files and swap it in.
+
+        Three streaming passes: cut transcripts into windows and count document
+        frequencies, fit the projection on a sample of windows, and embed all
+        windows into the memory-mapped vector matrix.
+
+        Args:
+            transcripts_dir: Flat transcripts directory
+            corpora_dir: Root directory holding per-channel corpora
+            dimensions: Vector dimensions
+            seed: Random seed for the SVD
+
+        Returns:
+            Number of windows indexed
+        """
+        from searcher import TranscriptSearcher
+
+        previous = self._read_current_name()
+        number = int(previous[len("build-"):]) + 1 if previous else 1
+        build_dir = self.index_dir / f"build-{number:08d}"
+        shutil.rmtree(build_dir, ignore_errors=True)
+        build_dir.mkdir(parents=True)
+        start_time = time.perf_counter()
+
+        # Pass 1: windows and document frequencies
+        print("[STEP 1/3] Cutting transcripts into windows...")
+        searcher = TranscriptSearcher(transcripts_dir, corpora_dir)
+        channel_numbers = {}
+        channels = array('i')
+        offsets = array('q')
+        df = Counter()
+
+        with open(build_dir / "windows.jsonl", 'wb') as f:
+            for channel, transcript_path in tqdm(searcher.get_transcript_files(), desc="Reading", unit="video"):
+                transcript_data = searcher.load_transcript(transcript_path)
+                if not transcript_data:
+                    continue
+
+                channel_number = channel_numbers.setdefault(channel, len(channel_numbers))
+                video_id = transcript_data.get('video_id', 'unknown')
+                for start, end, text in iter_windows(transcript_data.get('segments', [])):
+                    offsets.append(f.tell())
+                    channels.append(channel_number)
+                    window = {'video_id': video_id, 'channel': channel, 'start': start, 'end': end, 'text': text}
+                    f.write(json.dumps(window, ensure_ascii=False).encode('utf-8') + b'\n')
+                    df.update(set(tokenize(text)))
+
+        n_windows = len(offsets)
+        if not n_windows:
+            print("[ERROR] No transcript segments found")
+            shutil.rmtree(build_dir, ignore_errors=True)
+            return 0
+
+        # Pass 2: vocabulary, idf and projection
+        print(f"[STEP 2/3] Fitting projection on {min(n_windows, SVD_SAMPLE)} of {n_windows} windows...")
+        if n_windows >= MIN_WINDOWS_FOR_LIMITS:
+            max_df = MAX_DF_RATIO * n_windows
+            candidates = ((count, term) for term, count in df.items() if MIN_DF <= count <= max_df)
+            terms = sorted(term for _, term in heapq.nlargest(MAX_TERMS, candidates))
+        else:
+            terms = sorted(df)
+        term_ids = {term: i for i, term in enumerate(terms)}
+        idf = np.array([np.log((1 + n_windows) / (1 + df[term])) + 1 for term in terms], dtype=np.float32)
+        del df
+
+        offsets = np.frombuffer(offsets, dtype=np.int64)
+        sample_ids = np.unique(np.linspace(0, n_windows - 1, min(n_windows, SVD_SAMPLE)).astype(np.int64))
+        with open(build_dir / "windows.jsonl", 'rb') as f:
+            sample_texts = []
+            for window_id in sample_ids:
+                f.seek(int(offsets[window_id]))
+                sample_texts.append(json.loads(f.readline())['text'])
+        projection = fit_projection(*tfidf_rows(sample_texts, term_ids, idf), len(terms), dimensions, seed)
+        del sample_texts
+
+        # Pass 3: embed every window into the memory-mapped matrix
+        dimensions = projection.shape[1]
+        print(f"[STEP 3/3] Embedding {n_windows} windows ({dimensions} dimensions)...")
+        vectors = np.lib.format.open_memmap(build_dir / "vectors.npy", mode='w+',
+                                            dtype=np.float32, shape=(n_windows, dimensions))
+        with open(build_dir / "windows.jsonl", 'rb') as f:
+            for start in tqdm(range(0, n_windows, EMBED_BATCH), desc="Embedding", unit="batch"):
+                count = min(EMBED_BATCH, n_windows - start)
+                texts = [json.loads(f.readline())['text'] for _ in range(count)]
+                vectors[start:start + count] = normalize_rows(csr_dot(*tfidf_rows(texts, term_ids, idf), projection))
+        vectors.flush()
+        del vectors
+
+        np.save(build_dir / "idf.npy", idf)
+        np.save(build_dir / "projection.npy", projection)
+        np.save(build_dir / "channels.npy", np.frombuffer(channels, dtype=np.int32))
+        np.save(build_dir / "offsets.npy", offsets)
+        with open(build_dir / "terms.json", 'w', encoding='utf-8') as f:
+            json.dump(terms, f, ensure_ascii=False)
+        with open(build_dir / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'windows': n_windows,
+                'dimensions': dimensions,
+                'terms': len(terms),
+                'window_segments': WINDOW_SEGMENTS,
+                'window_stride': WINDOW_STRIDE,
+                'channels': sorted(channel_numbers, key=channel_numbers.get)
+            }, f, ensure_ascii=False)
+
+        # Swap the new build in; servers pick it up on their next query
+        (self.index_dir / ".CURRENT.tmp").write_text(build_dir.name, encoding='utf-8')
+        os.replace(self.index_dir / ".CURRENT.tmp", self.index_dir / "CURRENT")
+
+        # Old builds may still be memory-mapped by a server on Windows; they are retried next build
+        for old_dir in self.index_dir.glob("build-*"):
+            if old_dir.name != build_dir.name:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+        elapsed = time.perf_counter() - start_time
+        print(f"[SEMANTIC] Indexed {n_windows} windows, {len(terms)} terms in {elapsed:.1f}s")
+        return n_windows
+
+    def search_many(self, queries: List[str], top_k: int = 20, channels: List[str] = None) -> List[List[Dict]]:
+        """
+        Find the windows most similar to each of several queries.
+
+        All queries are scored together: each batch of vectors is read once
+        and multiplied by the query matrix, and only the best candidates of
+        each batch are kept.
+
+        Args:
+            queries: Query texts
+            top_k: Maximum number of results per query
+            channels: Only search these channels (None for all windows)
+
+        Returns:
+            One list per query of window dictionaries (video_id, channel,
+            start, end, text, score), best first
+
+        Raises:
+            ValueError: If top_k is less than 1
+        """
+        if top_k < 1:
+            raise ValueError(f"top_k must be at least 1, got {top_k}")
+
+        build = self.open()
+        query_vectors = build.embed(queries)
+        n_windows = len(build.vectors)
+
+        mask = None
+        if channels is not None:
+            numbers = [build.channel_numbers[c] for c in channels if c in build.channel_numbers]
+            mask = np.isin(build.channels, numbers)
+
+        # Each kept window drops at most its overlapping neighbours on either side,
+        # so this many candidates always leave top_k windows (if that many score above 0)
+        window_segments = build.meta.get('window_segments', WINDOW_SEGMENTS)
+        window_stride = build.meta.get('window_stride', WINDOW_STRIDE)
+        neighbours = -(-window_segments // window_stride) - 1
+        k = min(top_k * (2 * neighbours + 1), n_windows)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, n_windows, SEARCH_BATCH):
+            end = min(start + SEARCH_BATCH, n_windows)
+            scores = query_vectors @ build.vectors[start:end].T
+            if mask is not None:
+                scores[:, ~mask[start:end]] = -np.inf
+
+            ids = np.broadcast_to(np.arange(start, end), scores.shape)
+            if scores.shape[1] > k:
+                top = np.argpartition(scores, -k, axis=1)[:, -k:]
+                scores = np.take_along_axis(scores, top, axis=1)
+                ids = top + start
+
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_ids = np.concatenate([best_ids, ids], axis=1)
+            if best_scores.shape[1] > k:
+                top = np.argpartition(best_scores, -k, axis=1)[:, -k:]
+                best_scores = np.take_along_axis(best_scores, top, axis=1)
+                best_ids = np.take_along_axis(best_ids, top, axis=1)
+
+        results = []
+        for scores, ids in zip(best_scores, best_ids):
+            order = np.argsort(-scores, kind='stable')
+            order = order[scores[order] > 0]
+            windows = build.read_windows(ids[order].tolist())
+
+            # Keep the best of overlapping windows of the same video
+            selected = []
+            taken = {}
+            for window, score in zip(windows, scores[order].tolist()):
+                spans = taken.setdefault((window['channel'], window['video_id']), [])
+                if any(window['start'] < hi and window['end'] > lo for lo, hi in spans):
+                    continue
+                spans.append((window['start'], window['end']))
+                window['score'] = score
+                selected.append(window)
+                if len(selected) == top_k:
+                    break
+            results.append(selected)
+
+        return results
+
+    def search(self, query: str, top_k: int = 20, channels: List[str] = None) -> List[Dict]:
+        """
+        Find the windows most similar to a query.
+
+        Args:
+            query: Query text
+            top_k: Maximum number of results
+            channels: Only search these channels (None for all windows)
+
+        Returns:
+            List of window dictionaries (video_id, channel, start, end, text, score), best first
+
+        Raises:
+            ValueError: If top_k is less than 1
+        """
+        return self.search_many([query], top_k, channels)[0]
+
+
+def main():
+    """Main function for standalone execution."""
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("Usage: python semantic.py build [dimensions]")
+        return
+
+    dimensions = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DIMENSIONS
+    index = SemanticIndex()
+    n_windows = index.build(dimensions=dimensions)
+    if n_windows:
+        print(f"[COMPLETE] Semantic index ready ({n_windows} windows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Video sources used by the downloader and the metadata fetchers.
+
+A source lists a channel's videos, downloads a video and fetches a video's
+metadata. The yt-dlp sources talk to YouTube; the fake source (see
+fake_source.py) serves a synthetic channel for offline testing and
+benchmarking. The source is chosen with the VIDEO_INDEX_SOURCE environment
+variable ("auto", "inprocess", "subprocess" or "fake").
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+VIDEO_FORMAT = "best[ext=mp4]/best"
+SOURCE_ENV = "VIDEO_INDEX_SOURCE"
+
+# Error messages of failures that may succeed when retried (yt-dlp messages and subprocess stderr)
+TRANSIENT_ERROR_PATTERN = re.compile(
+    r"HTTP Error (?:429|5\d\d)|TransportError|timed out|Connection (?:reset|refused|aborted)"
+    r"|Temporary failure in name resolution|Remote end closed|IncompleteRead",
+    re.IGNORECASE)
+
+
+class TransientSourceError(RuntimeError):
+    """Source failure that may succeed when retried."""
+
+
+def video_url(video_id: str) -> str:
+    """Get the watch URL of a video."""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def format_metadata(info: Dict) -> Dict:
+    """
+    Convert raw video info into the metadata used by the search interfaces.
+
+    Args:
+        info: Raw video info (yt-dlp style keys)
+
+    Returns:
+        Dictionary with title, upload_date, upload_date_raw, author, channel_id and duration
+    """
+    # Parse upload date (format: YYYYMMDD)
+    upload_date_str = info.get('upload_date') or ''
+    if upload_date_str:
+        upload_date = datetime.strptime(upload_date_str, '%Y%m%d')
+        formatted_date = upload_date.strftime('%B %d, %Y')
+    else:
+        formatted_date = 'Unknown'
+
+    return {
+        'title': info.get('title', 'Unknown Title'),
+        'upload_date': formatted_date,
+        'upload_date_raw': upload_date_str,
+        'author': info.get('uploader', 'Unknown'),
+        'channel_id': info.get('channel_id', ''),
+        'duration': info.get('duration', 0)
+    }
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Check whether a source failure is worth retrying.
+
+    Network errors, timeouts and HTTP 429/5xx responses are transient. Private,
+    unavailable or members-only videos and other errors are not.
+
+    Args:
+        error: Exception raised by a source
+
+    Returns:
+        True if the request may succeed when retried
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (TransientSourceError, ConnectionError, TimeoutError)):
+            return True
+        # yt-dlp and urllib HTTP errors carry the response status
+        status = getattr(error, 'status', None) or getattr(error, 'code', None)
+        if isinstance(status, int) and (status == 429 or 500 <= status < 600):
+            return True
+        if TRANSIENT_ERROR_PATTERN.search(str(error) + str(getattr(error, 'stderr', None) or '')):
+            return True
+        # yt-dlp's DownloadError wraps the original exception in exc_info
+        exc_info = getattr(error, 'exc_info', None)
+        wrapped = exc_info[1] if isinstance(exc_info, tuple) and len(exc_info) > 1 else None
+        error = wrapped or error.__cause__ or error.__context__
+    return False
+
+
+class VideoSource:
+    """Interface shared by all video sources."""
+
+    name = "base"
+
+    def list_videos(self, channel_url: str) -> Iterator[Dict]:
+        """
+        List the videos of a channel without downloading them.
+
+        Args:
+            channel_url: URL of the channel/profile
+
+        Returns:
+            Iterator of flat entries (id, title, duration)
+        """
+        raise NotImplementedError
+
+    def download(self, video_url: str, output_path: Path):
+        """
+        Download a single video.
+
+        Args:
+            video_url: URL of the video
+            output_path: Destination file
+
+        Raises:
+            Exception: If the download fails
+        """
+        raise NotImplementedError
+
+    def fetch_metadata(self, video_id: str) -> Dict:
+        """
+        Fetch the raw info of a single video.
+
+        Args:
+            video_id: Video ID
+
+        Returns:
+            Raw video info (title, upload_date, uploader, channel_id, duration)
+        """
+        raise NotImplementedError
+
+
+class YtDlpSource(VideoSource):
+    """
+    Runs yt-dlp in-process, reusing one YoutubeDL instance (and its connection
+    pool) per downloading thread, and a pool of metadata-only instances.
+    """
+
+    name = "inprocess"
+
+    def __init__(self, concurrent_fragments: int = 4, progress_hook: Callable[[Dict], None] = None):
+        """
+        Initialize the in-process source.
+
+        Args:
+            concurrent_fragments: Number of fragments of a DASH/HLS video downloaded in parallel
+            progress_hook: Called with yt-dlp progress dictionaries while downloading
+        """
+        import yt_dlp
+        self._yt_dlp = yt_dlp
+        self.concurrent_fragments = concurrent_fragments
+        self.progress_hook = progress_hook
+        # YoutubeDL is not thread-safe, so each worker thread gets its own instance
+        self._local = threading.local()
+        # Idle metadata instances; web server request threads are short-lived, so
+        # instances are borrowed from this pool instead of being thread-local
+        self._metadata_pool = []
+        self._metadata_lock = threading.Lock()
+
+    def _ydl(self):
+        """Get this thread's YoutubeDL instance, creating it on first use."""
+        ydl = getattr(self._local, 'ydl', None)
+        if ydl is None:
+            ydl_opts = {
+                'quiet': True,
+                'no_warnings': True,
+                'noprogress': True,
+                'extract_flat': 'in_playlist',
+                'format': VIDEO_FORMAT,
+                'concurrent_fragment_downloads': self.concurrent_fragments,
+                'progress_hooks': [self.progress_hook] if self.progress_hook else [],
+            }
+            ydl = self._yt_dlp.YoutubeDL(ydl_opts)
+            self._local.ydl = ydl
+        return ydl
+
+    def _iter_entries(self, info: Dict) -> Iterator[Dict]:
+        """Yield video entries, descending into nested playlists such as channel tabs."""
+        for entry in info.get('entries') or []:
+            if not entry:
+                continue
+            if entry.get('_type') == 'playlist':
+                yield from self._iter_entries(entry)
+            elif entry.get('_type') == 'url' and entry.get('ie_key') == 'YoutubeTab':
+                yield from self._iter_entries(self._ydl().extract_info(entry['url'], download=False))
+            else:
+                yield entry
+
+    def list_videos(self, channel_url: str) -> Iterator[Dict]:
+        info = self._ydl().extract_info(channel_url, download=False)
+        return self._iter_entries(info)
+
+    def download(self, video_url: str, output_path: Path):
+        ydl = self._ydl()
+        ydl.params['outtmpl']['default'] = str(output_path)
+        ydl.download([video_url])
+
+    def fetch_metadata(self, video_id: str) -> Dict:
+        # Concurrent lookups each borrow their own instance, so they run in parallel
+        with self._metadata_lock:
+            ydl = self._metadata_pool.pop() if self._metadata_pool else None
+        if ydl is None:
+            # Without the download options (format selection, flat extraction) of _ydl()
+            ydl = self._yt_dlp.YoutubeDL({
+                'quiet': True,
+                'no_warnings': True,
+                'skip_download': True,
+            })
+        try:
+            return ydl.extract_info(video_url(video_id), download=False)
+        finally:
+            with self._metadata_lock:
+                self._metadata_pool.append(ydl)
+
+
+class SubprocessSource(VideoSource):
+    """Runs `python -m yt_dlp` as a new subprocess for every call (fallback source)."""
+
+    name = "subprocess"
+
+    def list_videos(self, channel_url: str) -> Iterator[Dict]:
+        cmd = [
+            sys.executable, "-m", "yt_dlp",
+            "--flat-playlist",
+            "--dump-json",
+            channel_url
+        ]
+
+        # Stream the output (one JSON object per line) instead of buffering it. Stderr
+        # goes to a temporary file: a second pipe could fill up and block yt-dlp
+        # while stdout is being read
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as stderr_file:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True)
+            entries = []
+            with process.stdout:
+                for line in process.stdout:
+                    line = line.strip()
+                    if line:
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+
+            if process.wait() != 0:
+                stderr_file.seek(0)
+                raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr_file.read())
+        return iter(entries)
+
+    def download(self, video_url: str, output_path: Path):
+        cmd = [
+            sys.executable, "-m", "yt_dlp",
+            "-f", VIDEO_FORMAT,
+            "-o", str(output_path),
+            video_url
+        ]
+
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+
+    def fetch_metadata(self, video_id: str) -> Dict:
+        cmd = [
+            sys.executable, "-m", "yt_dlp",
+            "--dump-json",
+            "--skip-download",
+            video_url(video_id)
+        ]
+
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        return json.loads(result.stdout)
+
+
+def create_source(name: str = None, concurrent_fragments: int = 4,
+                  progress_hook: Callable[[Dict], None] = None) -> VideoSource:
+    """
+    Create a video source.
+
+    Args:
+        name: "inprocess", "subprocess", "fake", or "auto" (in-process when the
+            yt_dlp package can be imported, subprocess otherwise). Defaults to
+            the VIDEO_INDEX_SOURCE environment variable, then "auto".
+        concurrent_fragments: Parallel fragment downloads (in-process source only)
+        progress_hook: Progress callback while downloading
+
+    Returns:
+        Video source instance
+    """
+    name = name or os.environ.get(SOURCE_ENV) or "auto"
+
+    if name == "fake":
+        from fake_source import FakeSource
+        return FakeSource.from_env(progress_hook=progress_hook)
+
+    if name == "subprocess":
+        return SubprocessSource()
+
+    if name not in ("auto", "inprocess"):
+        raise ValueError(f"Unknown video source '{name}'")
+
+    try:
+        return YtDlpSource(concurrent_fragments=concurrent_fragments, progress_hook=progress_hook)
+    except ImportError:
+        if name == "inprocess":
+            raise
+        print("[INFO] yt_dlp package not importable, using subprocess source")
+        return SubprocessSource()
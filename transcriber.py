@@ -1,15 +1,109 @@
 """
 Video transcription module using OpenAI Whisper.
+
+whisper (and with it torch) and numpy are imported only when a model is
+loaded or audio is decoded, so modules that just need the transcript
+helpers start quickly.
 """
-import whisper
 import json
+import os
+import shutil
+import subprocess
+from collections import Counter
 from pathlib import Path
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict
 from tqdm import tqdm
+from live_index import DEFAULT_INDEX_DIR, IndexWriter
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Tolerance (seconds) when deciding whether segments from neighbouring chunks overlap
+OVERLAP_TOLERANCE = 0.5
+
+# Sample rate Whisper models expect (whisper.audio.SAMPLE_RATE)
+SAMPLE_RATE = 16000
+
+
+def load_audio_window(file: str, start: float, duration: float, sr: int = SAMPLE_RATE) -> "np.ndarray":
+    """
+    Decode one window of a media file to mono float32 audio.
+    
+    Same decoding as whisper.load_audio, but seeks with ffmpeg so only the
+    requested window is ever held in memory.
+    
+    Args:
+        file: Path to the media file
+        start: Window start in seconds
+        duration: Window length in seconds
+        sr: Sample rate to resample to
+        
+    Returns:
+        Audio samples (empty once start is past the end of the file)
+    """
+    cmd = [
+        "ffmpeg", "-nostdin",
+        "-threads", "0",
+        "-ss", f"{start:.3f}",
+        "-t", f"{duration:.3f}",
+        "-i", file,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "-"
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to load audio: {e.stderr.decode()}") from e
+    
+    import numpy as np
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def stitch_chunks(chunks: List[Dict], complete: bool = True) -> List[Dict]:
+    """
+    Stitch chunk checkpoints into one list of non-overlapping segments.
+    
+    Each chunk is transcribed with some overlap past its nominal end so that
+    segments crossing the boundary are complete. A chunk keeps only the
+    segments that start before its nominal end, and segments from the next
+    chunk that start before the previous kept segment ends are dropped as
+    duplicates.
+    
+    Args:
+        chunks: Chunk checkpoints in order (start, nominal_end, segments)
+        complete: Whether the last chunk reaches the end of the media; if not,
+            its overlap tail is left for the next chunk
+        
+    Returns:
+        List of segments with absolute timestamps
+    """
+    segments = []
+    last_end = 0.0
+    
+    for i, chunk in enumerate(chunks):
+        keep_tail = complete and i == len(chunks) - 1
+        
+        for segment in chunk['segments']:
+            if not keep_tail and segment['start'] >= chunk['nominal_end']:
+                continue
+            if segment['start'] < last_end - OVERLAP_TOLERANCE:
+                continue
+            
+            start = max(segment['start'], last_end)
+            end = max(segment['end'], start)
+            segments.append({'start': start, 'end': end, 'text': segment['text']})
+            last_end = end
+    
+    return segments
 
 
 class VideoTranscriber:
-    def __init__(self, model_name: str = "base", videos_dir: str = "videos", transcripts_dir: str = "transcripts"):
+    def __init__(self, model_name: str = "base", videos_dir: str = "videos", transcripts_dir: str = "transcripts",
+                 model=None, chunk_seconds: float = None, chunk_overlap: float = 5.0,
+                 index_dir: str = DEFAULT_INDEX_DIR, channel: str = None):
         """
         Initialize the video transcriber.
         
@@ -17,20 +111,79 @@ class VideoTranscriber:
             model_name: Whisper model to use (tiny, base, small, medium, large)
             videos_dir: Directory containing video files
             transcripts_dir: Directory where transcripts will be saved
+            model: Already loaded Whisper model to reuse (skips loading model_name again)
+            chunk_seconds: Transcribe in windows of this many seconds, checkpointing
+                each window so long videos can resume and become searchable
+                early (None to transcribe in one pass)
+            chunk_overlap: Extra seconds transcribed past each window boundary
+            index_dir: Live search index that new transcripts are appended to
+                (None to only write transcript files)
+            channel: Channel the transcripts belong to in the index (None for
+                the flat transcripts directory)
         """
-        print(f"[INFO] Loading Whisper model: {model_name}")
-        self.model = whisper.load_model(model_name)
+        self.model_name = model_name
+        self.index_writer = IndexWriter(index_dir) if index_dir else None
+        self.channel = channel
+        self.chunk_seconds = chunk_seconds
+        self.chunk_overlap = chunk_overlap
         self.videos_dir = Path(videos_dir)
         self.transcripts_dir = Path(transcripts_dir)
-        self.transcripts_dir.mkdir(exist_ok=True)
+        self.transcripts_dir.mkdir(parents=True, exist_ok=True)
+        
+        if model is not None:
+            self.model = model
+            return
+        
+        print(f"[INFO] Loading Whisper model: {model_name}")
+        import whisper
+        self.model = whisper.load_model(model_name)
         print(f"[INFO] Whisper model loaded successfully")
     
-    def transcribe_video(self, video_path: Path) -> Dict:
+    def save_transcript(self, transcript_path: Path, transcript_data: Dict):
+        """
+        Write a transcript atomically.
+        
+        The data is written to a temporary file and then renamed over the
+        target, so readers see either the previous transcript or the new one.
+        
+        Args:
+            transcript_path: Destination transcript file
+            transcript_data: Transcript data dictionary
+        """
+        tmp_path = transcript_path.with_name(f".{transcript_path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(transcript_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, transcript_path)
+    
+    def publish_transcript(self, transcript_path: Path, transcript_data: Dict, new_segments: List[Dict] = None):
+        """
+        Save a (final or partial) transcript and append it to the live index.
+        
+        Args:
+            transcript_path: Destination transcript file
+            transcript_data: Transcript data dictionary
+            new_segments: Segments added since the partial transcript was last
+                published; only these are written to the index (None to
+                index the whole transcript)
+        """
+        self.save_transcript(transcript_path, transcript_data)
+        
+        if self.index_writer:
+            try:
+                if new_segments is None:
+                    self.index_writer.add(transcript_data, self.channel)
+                elif new_segments:
+                    self.index_writer.add(dict(transcript_data, segments=new_segments), self.channel, append=True)
+            except Exception as e:
+                print(f"[WARNING] Failed to add {transcript_data['video_id']} to the search index: {str(e)}")
+    
+    def transcribe_video(self, video_path: Path, overwrite: bool = False) -> Dict:
         """
         Transcribe a single video file.
         
         Args:
             video_path: Path to the video file
+            overwrite: Re-transcribe and replace an existing transcript
             
         Returns:
             Dictionary containing transcript data with timestamps
@@ -39,13 +192,20 @@ class VideoTranscriber:
         transcript_path = self.transcripts_dir / f"{video_id}.json"
         
         # Skip if already transcribed
-        if transcript_path.exists():
+        if transcript_path.exists() and not overwrite:
             print(f"[SKIP] Transcript for {video_id} already exists")
             with open(transcript_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         
         print(f"[TRANSCRIBE] Processing {video_id}...")
         
+        if self.chunk_seconds:
+            try:
+                return self.transcribe_video_chunked(video_path, publish_partial=not transcript_path.exists())
+            except Exception as e:
+                print(f"[ERROR] Failed to transcribe {video_id}: {str(e)}")
+                return None
+        
         try:
             # Transcribe with word-level timestamps
             result = self.model.transcribe(
@@ -67,13 +227,13 @@ class VideoTranscriber:
                 'video_id': video_id,
                 'video_path': str(video_path),
                 'language': result.get('language', 'unknown'),
+                'model': self.model_name,
                 'segments': segments,
                 'full_text': result['text']
             }
             
             # Save transcript
-            with open(transcript_path, 'w', encoding='utf-8') as f:
-                json.dump(transcript_data, f, indent=2, ensure_ascii=False)
+            self.publish_transcript(transcript_path, transcript_data)
             
             print(f"[SUCCESS] Transcript saved: {transcript_path}")
             return transcript_data
@@ -82,6 +242,138 @@ class VideoTranscriber:
             print(f"[ERROR] Failed to transcribe {video_id}: {str(e)}")
             return None
     
+    def transcribe_video_chunked(self, video_path: Path, publish_partial: bool = True) -> Dict:
+        """
+        Transcribe a video window by window with resumable checkpoints.
+        
+        Each finished window is saved under transcripts/.checkpoints/<video_id>/
+        with absolute timestamps, so an interrupted run resumes from the last
+        completed window. After every window the segments so far are published
+        as <video_id>.partial.json for the searcher; the index only receives
+        the segments added since the previous window, so its deltas stay small. Once the end of the media
+        is reached the windows are stitched into the final transcript and the
+        partial file and checkpoints are removed.
+        
+        Args:
+            video_path: Path to the video file
+            publish_partial: Whether to publish partial transcripts while working
+            
+        Returns:
+            Dictionary containing transcript data with timestamps
+        """
+        video_id = video_path.stem
+        transcript_path = self.transcripts_dir / f"{video_id}.json"
+        partial_path = self.transcripts_dir / f"{video_id}.partial.json"
+        checkpoint_dir = self.transcripts_dir / ".checkpoints" / video_id
+        manifest_path = checkpoint_dir / "manifest.json"
+        
+        # Checkpoints are only reusable with the same model and window layout
+        manifest = {
+            'model': self.model_name,
+            'chunk_seconds': self.chunk_seconds,
+            'chunk_overlap': self.chunk_overlap
+        }
+        if manifest_path.exists():
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                if json.load(f) != manifest:
+                    print(f"[INFO] Discarding checkpoints for {video_id} (settings changed)")
+                    shutil.rmtree(checkpoint_dir)
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.save_transcript(manifest_path, manifest)
+        
+        chunks = []
+        language = None
+        index = 0
+        # Stitched segments are append-only until the last window, so later
+        # publishes only index the segments after the first `published`
+        published = None
+        
+        while True:
+            chunk_path = checkpoint_dir / f"chunk_{index:05d}.json"
+            start = index * self.chunk_seconds
+            
+            if chunk_path.exists():
+                with open(chunk_path, 'r', encoding='utf-8') as f:
+                    chunk = json.load(f)
+                print(f"[RESUME] {video_id}: chunk {index} already transcribed")
+            else:
+                window = self.chunk_seconds + self.chunk_overlap
+                audio = load_audio_window(str(video_path), start, window)
+                if audio.size == 0:
+                    break
+                
+                duration = audio.size / SAMPLE_RATE
+                print(f"[TRANSCRIBE] {video_id}: chunk {index} ({start:.0f}s - {start + duration:.0f}s)")
+                
+                # Keep the language of the first window for the rest of the video
+                result = self.model.transcribe(
+                    audio,
+                    word_timestamps=True,
+                    verbose=False,
+                    language=language
+                )
+                
+                chunk = {
+                    'index': index,
+                    'start': start,
+                    'nominal_end': start + self.chunk_seconds,
+                    'last': duration < window - 0.5,
+                    'language': result.get('language', 'unknown'),
+                    'segments': [{
+                        'start': start + segment['start'],
+                        'end': start + segment['end'],
+                        'text': segment['text'].strip()
+                    } for segment in result['segments']]
+                }
+                self.save_transcript(chunk_path, chunk)
+            
+            chunks.append(chunk)
+            language = language or chunk['language']
+            
+            if chunk['last']:
+                break
+            
+            if publish_partial:
+                segments = stitch_chunks(chunks, complete=False)
+                self.publish_transcript(partial_path, {
+                    'video_id': video_id,
+                    'video_path': str(video_path),
+                    'language': language,
+                    'model': self.model_name,
+                    'partial': True,
+                    'segments': segments
+                }, new_segments=None if published is None else segments[published:])
+                published = len(segments)
+            
+            index += 1
+        
+        if not chunks:
+            raise RuntimeError(f"No audio decoded from {video_path}")
+        
+        segments = stitch_chunks(chunks)
+        languages = Counter(chunk['language'] for chunk in chunks)
+        
+        transcript_data = {
+            'video_id': video_id,
+            'video_path': str(video_path),
+            'language': languages.most_common(1)[0][0],
+            'model': self.model_name,
+            'segments': segments,
+            'full_text': ' '.join(segment['text'] for segment in segments)
+        }
+        
+        # Publish the final transcript before removing the partial one
+        self.publish_transcript(transcript_path, transcript_data)
+        partial_path.unlink(missing_ok=True)
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        try:
+            checkpoint_dir.parent.rmdir()
+        except OSError:
+            pass  # Other videos still have checkpoints
+        
+        print(f"[SUCCESS] Transcript saved: {transcript_path} ({len(chunks)} chunks)")
+        return transcript_data
+    
     def transcribe_all(self) -> List[str]:
         """
         Transcribe all videos in the videos directory.
@@ -117,11 +409,16 @@ def main():
     if len(sys.argv) > 1:
         model_name = sys.argv[1]
     
+    chunk_seconds = None
+    if len(sys.argv) > 2:
+        chunk_seconds = float(sys.argv[2])
+        print(f"[INFO] Transcribing in checkpointed chunks of {chunk_seconds:.0f} seconds")
+    
     print(f"[INFO] Using Whisper model: {model_name}")
     print("[INFO] Available models: tiny, base, small, medium, large")
     print("[INFO] Larger models are more accurate but slower")
     
-    transcriber = VideoTranscriber(model_name=model_name)
+    transcriber = VideoTranscriber(model_name=model_name, chunk_seconds=chunk_seconds)
     transcribed = transcriber.transcribe_all()
     
     print(f"\n[COMPLETE] Transcripts saved to: {transcriber.transcripts_dir.absolute()}")
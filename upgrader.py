@@ -0,0 +1,306 @@
+"""
+Background upgrade queue for tiered transcription.
+
+Videos are first transcribed with a fast model (tiny/base) so they become
+searchable quickly. This module re-transcribes them with a larger model,
+most-searched and most recently searched videos first, and atomically
+replaces the earlier transcripts. Transcripts that do not record their
+model are left alone unless include_unknown is set (--include-unknown).
+
+Usage: python upgrader.py [model] [max_videos|all] [chunk_seconds] [--watch] [--include-unknown]
+"""
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Tuple
+from corpora import DEFAULT_CORPORA_DIR, channel_dirs, list_channels
+from downloader import ChannelDownloader
+from live_index import DEFAULT_INDEX_DIR
+from transcriber import VideoTranscriber
+from process_videos import replace_with_placeholder
+from search_hits import DEFAULT_HITS_PATH, SearchHitLog
+from sources import video_url
+
+MODEL_RANKS = {'tiny': 0, 'base': 1, 'small': 2, 'medium': 3, 'turbo': 3, 'large': 4}
+
+
+def model_rank(model_name: str) -> int:
+    """
+    Rank a Whisper model by size/accuracy.
+
+    Args:
+        model_name: Whisper model name, e.g. "base", "medium.en", "large-v3"
+
+    Returns:
+        Rank (higher is more accurate); -1 for unknown or missing models
+    """
+    if not model_name:
+        return -1
+    base_name = model_name.split('.')[0].split('-')[0]
+    return MODEL_RANKS.get(base_name, -1)
+
+
+class TranscriptUpgrader:
+    def __init__(self, model_name: str = "medium", corpora: List[Tuple] = None,
+                 hits_path: str = DEFAULT_HITS_PATH, half_life_days: float = 7.0,
+                 include_unknown: bool = False, index_dir: str = DEFAULT_INDEX_DIR,
+                 chunk_seconds: float = None):
+        """
+        Initialize the transcript upgrader.
+
+        Args:
+            model_name: Larger Whisper model used for upgrades
+            corpora: List of (videos_dir, transcripts_dir, channel) tuples to
+                upgrade; channel is the corpus' channel in the search index (None
+                or omitted for the flat directories). Defaults to the flat
+                videos/ and transcripts/ directories plus every channel corpus.
+            hits_path: Search-hit log used for prioritization
+            half_life_days: Half-life for decaying old search hits
+            include_unknown: Also upgrade transcripts that do not record a known
+                model (e.g. written before transcripts recorded their model,
+                which may already come from a large model)
+            index_dir: Live search index that upgraded transcripts are appended to
+            chunk_seconds: Transcribe in checkpointed windows of this many seconds,
+                so upgrades of long videos resume after an interruption
+                (see VideoTranscriber)
+        """
+        if corpora is None:
+            corpora = [("videos", "transcripts", None)]
+            corpora.extend(channel_dirs(channel) + (channel,) for channel in list_channels(DEFAULT_CORPORA_DIR))
+
+        self.model_name = model_name
+        self.corpora = [(Path(corpus[0]), Path(corpus[1]), corpus[2] if len(corpus) > 2 else None)
+                        for corpus in corpora]
+        self.index_dir = index_dir
+        self.chunk_seconds = chunk_seconds
+        self.hit_log = SearchHitLog(hits_path)
+        self.half_life = half_life_days * 86400
+        self.include_unknown = include_unknown
+        self.transcriber = None
+        self._stop = threading.Event()
+        self._finish = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def pending(self) -> List[Dict]:
+        """
+        Find transcripts produced by a smaller model than the upgrade model.
+
+        Returns:
+            List of upgrade items (video_id, transcript_path, videos_dir,
+            transcripts_dir, channel, model, mtime)
+        """
+        target = model_rank(self.model_name)
+        items = []
+
+        for videos_dir, transcripts_dir, channel in self.corpora:
+            for transcript_path in transcripts_dir.glob("*.json"):
+                try:
+                    with open(transcript_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except Exception as e:
+                    print(f"[WARNING] Failed to read {transcript_path}: {str(e)}")
+                    continue
+
+                # Partial transcripts are still being written by the first pass
+                rank = model_rank(data.get('model'))
+                if data.get('partial') or rank >= target:
+                    continue
+                if rank < 0 and not self.include_unknown:
+                    continue
+
+                items.append({
+                    'video_id': data.get('video_id', transcript_path.stem),
+                    'transcript_path': transcript_path,
+                    'videos_dir': videos_dir,
+                    'transcripts_dir': transcripts_dir,
+                    'channel': channel,
+                    'model': data.get('model', 'unknown'),
+                    'mtime': transcript_path.stat().st_mtime
+                })
+
+        return items
+
+    def prioritize(self, items: List[Dict]) -> List[Dict]:
+        """
+        Order upgrade items by decayed search-hit frequency, then recency.
+
+        A hit counts fully when fresh and half as much after each half-life,
+        so frequently *and* recently searched videos come first. Ties (e.g.
+        never-searched videos) fall back to the newest transcripts first.
+
+        Args:
+            items: Upgrade items from pending()
+
+        Returns:
+            Items sorted by descending priority
+        """
+        hits = self.hit_log.load()
+        now = time.time()
+
+        def priority(item):
+            entry = hits.get(item['video_id'], {'count': 0, 'last_hit': 0})
+            age = max(0.0, now - entry['last_hit'])
+            score = entry['count'] * 0.5 ** (age / self.half_life)
+            return (score, item['mtime'])
+
+        return sorted(items, key=priority, reverse=True)
+
+    def upgrade(self, item: Dict) -> bool:
+        """
+        Re-transcribe one video with the upgrade model.
+
+        Placeholder videos are downloaded again, and replaced with a placeholder
+        once the upgraded transcript has been written.
+
+        Args:
+            item: Upgrade item from pending()
+
+        Returns:
+            True if the transcript was upgraded
+        """
+        video_id = item['video_id']
+        video_path = item['videos_dir'] / f"{video_id}.mp4"
+
+        if not video_path.exists() or video_path.stat().st_size == 0:
+            print(f"[UPGRADE] Re-downloading {video_id} for upgrade...")
+            if video_path.exists():
+                video_path.unlink()
+            downloader = ChannelDownloader(output_dir=str(item['videos_dir']))
+            if not downloader.download_video(video_url(video_id), video_id):
+                print(f"[ERROR] Failed to download {video_id} for upgrade")
+                video_path.touch()
+                return False
+
+        if self.transcriber is None:
+            self.transcriber = VideoTranscriber(model_name=self.model_name,
+                                                videos_dir=str(item['videos_dir']),
+                                                transcripts_dir=str(item['transcripts_dir']),
+                                                chunk_seconds=self.chunk_seconds,
+                                                index_dir=self.index_dir)
+        self.transcriber.videos_dir = item['videos_dir']
+        self.transcriber.transcripts_dir = item['transcripts_dir']
+        self.transcriber.channel = item['channel']
+
+        print(f"[UPGRADE] {video_id}: {item['model']} -> {self.model_name}")
+        result = self.transcriber.transcribe_video(video_path, overwrite=True)
+        replace_with_placeholder(video_path)
+
+        return result is not None
+
+    def run(self, max_videos: int = None) -> List[str]:
+        """
+        Upgrade pending transcripts in priority order.
+
+        Priorities are re-evaluated after every upgrade so videos that become
+        popular while the queue is running move ahead.
+
+        Args:
+            max_videos: Maximum number of videos to upgrade (None for all)
+
+        Returns:
+            List of upgraded video IDs
+        """
+        queue = self.pending()
+        if not queue and self._thread is not None:
+            # Background polls stay quiet while there is nothing to do
+            return []
+        print(f"[INFO] {len(queue)} transcripts pending upgrade to '{self.model_name}'")
+
+        upgraded = []
+        while queue and not self._stop.is_set():
+            if max_videos is not None and len(upgraded) >= max_videos:
+                break
+
+            item = self.prioritize(queue)[0]
+            queue.remove(item)
+
+            if self.upgrade(item):
+                upgraded.append(item['video_id'])
+
+        print(f"[SUCCESS] Upgraded {len(upgraded)} transcripts to '{self.model_name}'")
+        return upgraded
+
+    def watch(self, poll_interval: float = 60.0):
+        """
+        Keep upgrading new transcripts until stop() (or finish()) is called.
+
+        Args:
+            poll_interval: Seconds to wait between scans when nothing is pending
+        """
+        while not self._stop.is_set():
+            try:
+                if self.run():
+                    continue
+            except Exception as e:
+                print(f"[ERROR] Transcript upgrade failed: {str(e)}")
+            if self._finish.is_set():
+                return
+            self._wake.wait(poll_interval)
+            self._wake.clear()
+
+    def start(self, poll_interval: float = 60.0):
+        """
+        Run watch() in a background thread.
+
+        Args:
+            poll_interval: Seconds to wait between scans when nothing is pending
+        """
+        self._stop.clear()
+        self._finish.clear()
+        self._thread = threading.Thread(target=self.watch, args=(poll_interval,), daemon=True)
+        self._thread.start()
+
+    def finish(self):
+        """Let the background thread upgrade everything still pending, then wait for it."""
+        self._finish.set()
+        self._wake.set()
+        self._join()
+
+    def stop(self, wait: bool = True):
+        """
+        Stop the background thread after the current upgrade finishes.
+
+        Args:
+            wait: Wait for the thread to exit
+        """
+        self._stop.set()
+        self._wake.set()
+        if wait:
+            self._join()
+
+    def _join(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    """Main function for standalone execution."""
+    args = sys.argv[1:]
+    watch = '--watch' in args
+    include_unknown = '--include-unknown' in args
+    args = [a for a in args if a not in ('--watch', '--include-unknown')]
+
+    model_name = args[0] if args else "medium"
+    max_videos = int(args[1]) if len(args) > 1 and args[1].lower() != "all" else None
+    chunk_seconds = float(args[2]) if len(args) > 2 else None
+
+    print(f"[INFO] Upgrading transcripts with Whisper model: {model_name}")
+
+    upgrader = TranscriptUpgrader(model_name=model_name, include_unknown=include_unknown,
+                                  chunk_seconds=chunk_seconds)
+    if watch:
+        print("[INFO] Watching for new transcripts (Ctrl+C to stop)")
+        try:
+            upgrader.watch()
+        except KeyboardInterrupt:
+            pass
+    else:
+        upgrader.run(max_videos)
+
+
+if __name__ == "__main__":
+    main()
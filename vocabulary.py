@@ -0,0 +1,223 @@
+"""
+Vocabulary with term frequencies for prefix autocomplete.
+
+Terms are kept in a sorted array with a parallel array of counts, so all
+terms with a given prefix form one contiguous range found by binary search.
+The arrays are updated as transcripts are added or replaced; new terms are
+merged into copies that are swapped in, so lookups are never blocked.
+"""
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+# Suggestions for prefixes up to this length are cached (they span the most terms)
+CACHED_PREFIX_LENGTH = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of terms (words, keeping inner apostrophes such as "don't")
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def count_terms(transcript_data: Dict) -> Counter:
+    """
+    Count the terms in a transcript's segments.
+
+    Args:
+        transcript_data: Transcript data dictionary (or index document)
+
+    Returns:
+        Counter of term frequencies
+    """
+    counts = Counter()
+    for segment in transcript_data.get('segments', []):
+        counts.update(tokenize(segment['text']))
+    return counts
+
+
+class Vocabulary:
+    def __init__(self):
+        """Initialize an empty vocabulary."""
+        self.terms = []
+        self.counts = []
+        self._cache = {}
+        # _lock guards reads and the swap of the arrays; _write_lock serializes apply()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @classmethod
+    def from_transcripts(cls, transcripts: Iterable[Dict]) -> "Vocabulary":
+        """
+        Build a vocabulary from transcripts.
+
+        Args:
+            transcripts: Transcript data dictionaries (or index documents)
+
+        Returns:
+            Vocabulary instance
+        """
+        counts = Counter()
+        for transcript_data in transcripts:
+            counts.update(count_terms(transcript_data))
+        return cls.from_counts(counts)
+
+    @classmethod
+    def from_counts(cls, counts: Counter) -> "Vocabulary":
+        """
+        Build a vocabulary from term frequencies.
+
+        Args:
+            counts: Counter of term frequencies
+
+        Returns:
+            Vocabulary instance
+        """
+        vocabulary = cls()
+        vocabulary.terms = sorted(term for term, count in counts.items() if count > 0)
+        vocabulary.counts = [counts[term] for term in vocabulary.terms]
+        return vocabulary
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "Vocabulary":
+        """
+        Restore a vocabulary exported with to_json().
+
+        Args:
+            data: Dictionary with sorted 'terms' and parallel 'counts'
+
+        Returns:
+            Vocabulary instance
+        """
+        vocabulary = cls()
+        vocabulary.terms = list(data['terms'])
+        vocabulary.counts = list(data['counts'])
+        return vocabulary
+
+    def apply(self, delta: Counter):
+        """
+        Add (or with negative counts, remove) term frequencies.
+
+        Count changes of existing terms are made in place. When terms are
+        added or removed, the new arrays are built with one linear merge
+        outside the lock and swapped in, so suggest() is never blocked by
+        the merge.
+
+        Args:
+            delta: Term frequency changes
+        """
+        with self._write_lock:
+            terms, counts = self.terms, self.counts
+            updated = {}
+            added = []
+            for term, change in delta.items():
+                if not change:
+                    continue
+                i = bisect_left(terms, term)
+                if i < len(terms) and terms[i] == term:
+                    updated[i] = counts[i] + change
+                elif change > 0:
+                    added.append((i, 1, term, change))
+            removed = [(i, 0, None, None) for i, count in updated.items() if count <= 0]
+
+            if not added and not removed:
+                with self._lock:
+                    for i, count in updated.items():
+                        counts[i] = count
+                    self._cache = {}
+                return
+
+            old_counts = list(counts)
+            for i, count in updated.items():
+                old_counts[i] = count
+
+            # Copy the unchanged runs between insertion/removal positions as slices
+            new_terms, new_counts = [], []
+            start = 0
+            for position, insert, term, count in sorted(added + removed):
+                if position > start:
+                    new_terms.extend(terms[start:position])
+                    new_counts.extend(old_counts[start:position])
+                    start = position
+                if insert:
+                    new_terms.append(term)
+                    new_counts.append(count)
+                else:
+                    start = position + 1
+            new_terms.extend(terms[start:])
+            new_counts.extend(old_counts[start:])
+
+            with self._lock:
+                self.terms, self.counts = new_terms, new_counts
+                self._cache = {}
+
+    def update(self, old_transcript: Dict = None, new_transcript: Dict = None):
+        """
+        Replace one transcript's terms with another's (either may be None).
+
+        Args:
+            old_transcript: Transcript being replaced or removed
+            new_transcript: Transcript being added
+        """
+        delta = Counter()
+        if new_transcript:
+            delta.update(count_terms(new_transcript))
+        if old_transcript:
+            delta.subtract(count_terms(old_transcript))
+        self.apply(delta)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get the most frequent terms starting with a prefix.
+
+        Args:
+            prefix: Prefix to complete (case-insensitive)
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of (term, count) tuples, most frequent first
+        """
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+
+        cache_key = (prefix, limit)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            start = bisect_left(self.terms, prefix)
+            end = bisect_left(self.terms, prefix + '\U0010ffff', lo=start)
+            best = heapq.nlargest(limit, range(start, end), key=self.counts.__getitem__)
+            suggestions = [(self.terms[i], self.counts[i]) for i in best]
+
+            if len(prefix) <= CACHED_PREFIX_LENGTH:
+                self._cache[cache_key] = suggestions
+
+        return suggestions
+
+    def to_json(self) -> Dict:
+        """
+        Export the vocabulary for client-side autocomplete.
+
+        Returns:
+            Dictionary with sorted 'terms' and parallel 'counts'
+        """
+        with self._lock:
+            return {'terms': list(self.terms), 'counts': list(self.counts)}
+
+    def __len__(self) -> int:
+        return len(self.terms)
@@ -3,12 +3,38 @@ Minimal web server for video transcript search interface.
 """
 from flask import Flask, render_template, request, jsonify
 from searcher import TranscriptSearcher
+from search_hits import DEFAULT_HITS_PATH
+from sources import create_source, format_metadata
+from live_index import DEFAULT_INDEX_DIR, INDEX_DIR_ENV, LiveIndex
+import atexit
 import os
-import yt_dlp
-from datetime import datetime
 
 app = Flask(__name__)
-searcher = TranscriptSearcher()
+
+# New transcripts become searchable within seconds, without a restart. The index
+# is started by the serving process only (see start_live_index), not on import
+live_index = LiveIndex(index_dir=os.environ.get(INDEX_DIR_ENV) or DEFAULT_INDEX_DIR)
+searcher = TranscriptSearcher(hits_path=DEFAULT_HITS_PATH, index=live_index)
+atexit.register(searcher.hit_log.flush)
+
+# Created on the first metadata request, so yt_dlp is not imported while the server boots
+_source = None
+
+def get_source():
+    """Get the video source, creating it on first use."""
+    global _source
+    if _source is None:
+        _source = create_source()
+    return _source
+
+@app.before_request
+def start_live_index():
+    """Start the live index in the process that serves requests (once)."""
+    live_index.start()
+
+def index_loading_response():
+    """Response for index-backed endpoints while the index is still loading."""
+    return jsonify({'error': 'The search index is still loading, try again in a moment'}), 503
 
 @app.route('/')
 def index():
@@ -23,25 +49,70 @@ def search():
     Query parameters:
         q: Search query string
         max_results: Maximum number of results (optional)
+        channels: Comma-separated channel names to restrict the search to (optional)
+        mode: "literal" (default) for exact matches, or "semantic" for segments
+            similar in meaning, most similar first
     """
     query = request.args.get('q', '').strip()
     max_results = request.args.get('max_results', type=int)
+    channels = [c.strip() for c in request.args.get('channels', '').split(',') if c.strip()]
+    mode = request.args.get('mode', 'literal')
     
     if not query:
         return jsonify({'error': 'No search query provided'}), 400
     
-    matches = searcher.search_all(query, max_results=max_results)
+    if max_results is not None and max_results < 1:
+        return jsonify({'error': 'max_results must be at least 1'}), 400
+    
+    if mode == 'semantic':
+        try:
+            matches = searcher.search_semantic(query, max_results=max_results, channels=channels or None)
+        except FileNotFoundError as e:
+            return jsonify({'error': str(e)}), 503
+    elif mode == 'literal':
+        if not live_index.ready.is_set():
+            return index_loading_response()
+        matches = searcher.search_all(query, max_results=max_results, channels=channels or None)
+    else:
+        return jsonify({'error': f"Unknown search mode '{mode}'"}), 400
     
     return jsonify({
         'query': query,
+        'mode': mode,
         'total_results': len(matches),
         'results': matches
     })
 
+@app.route('/api/suggest', methods=['GET'])
+def suggest():
+    """
+    Autocomplete endpoint that completes the last word of a query.
+    
+    Query parameters:
+        prefix: Query typed so far
+        limit: Maximum number of suggestions (optional, default 8)
+    """
+    prefix = request.args.get('prefix', '')
+    limit = min(request.args.get('limit', 8, type=int), 50)
+    
+    if not live_index.ready.is_set():
+        return index_loading_response()
+    
+    # Complete the word being typed, keeping the words before it
+    head, _, last_word = prefix.rpartition(' ')
+    head = f"{head} " if head else ''
+    suggestions = live_index.vocabulary.suggest(last_word, limit) if last_word else []
+    
+    return jsonify({
+        'prefix': prefix,
+        'suggestions': [{'text': head + term, 'term': term, 'count': count}
+                        for term, count in suggestions]
+    })
+
 @app.route('/api/video/<video_id>', methods=['GET'])
 def get_video_info(video_id):
     """
-    Get video metadata from YouTube.
+    Get video metadata from the video source (YouTube by default).
     
     Args:
         video_id: YouTube video ID
@@ -50,29 +121,14 @@ def get_video_info(video_id):
         JSON with title and upload_date
     """
     try:
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-        }
+        metadata = format_metadata(get_source().fetch_metadata(video_id))
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(f'https://www.youtube.com/watch?v={video_id}', download=False)
-            
-            # Parse upload date (format: YYYYMMDD)
-            upload_date_str = info.get('upload_date', '')
-            if upload_date_str:
-                upload_date = datetime.strptime(upload_date_str, '%Y%m%d')
-                formatted_date = upload_date.strftime('%B %d, %Y')
-            else:
-                formatted_date = 'Unknown'
-            
-            return jsonify({
-                'video_id': video_id,
-                'title': info.get('title', 'Unknown Title'),
-                'upload_date': formatted_date,
-                'upload_date_raw': upload_date_str
-            })
+        return jsonify({
+            'video_id': video_id,
+            'title': metadata['title'],
+            'upload_date': metadata['upload_date'],
+            'upload_date_raw': metadata['upload_date_raw']
+        })
     except Exception as e:
         return jsonify({
             'error': str(e),
@@ -87,4 +143,8 @@ if __name__ == '__main__':
     print("=" * 50)
     print("\nStarting server at http://localhost:5000")
     print("Press Ctrl+C to stop\n")
+    # The debug reloader's parent process only watches for code changes and
+    # serves from a child process (WERKZEUG_RUN_MAIN set), which loads the index
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        live_index.start()
     app.run(debug=True, host='0.0.0.0', port=5000)